@@ -1,9 +1,22 @@
-from fastapi import Depends
-# from src.services.alpha_vantage_provider import AlphaVantageProvider
+from functools import lru_cache
+from src.services.alpha_vantage_provider import AlphaVantageProvider
+from src.services.yahoo_finance_provider import YahooFinanceProvider
 from src.services.mock_provider import MockProvider
-from src.config import get_settings, Settings
+from src.services.provider_router import ProviderRouter
+from src.config import get_settings
 from src.services.financial_data_provider import FinancialDataProvider
 
+PROVIDER_FACTORIES = {
+    "yahoo_finance": lambda settings: YahooFinanceProvider(),
+    "alpha_vantage": lambda settings: AlphaVantageProvider(settings.alpha_vantage_api_key),
+    "mock": lambda settings: MockProvider()
+}
+
+@lru_cache()
+def get_provider_router() -> ProviderRouter:
+    settings = get_settings()
+    names = [name.strip() for name in settings.financial_providers.split(",") if name.strip()]
+    return ProviderRouter([PROVIDER_FACTORIES[name](settings) for name in names])
+
 def get_financial_provider() -> FinancialDataProvider:
-    # return AlphaVantageProvider(settings.alpha_vantage_api_key)
-    return MockProvider()
\ No newline at end of file
+    return get_provider_router()
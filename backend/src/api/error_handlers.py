@@ -1,6 +1,6 @@
 from fastapi import Request
 from fastapi.responses import JSONResponse
-from src.models.errors import CustomHTTPException, StockNotFoundError, RateLimitError, StockAPIError
+from src.models.errors import CustomHTTPException, StockNotFoundError, RateLimitError, StockAPIError, CircuitOpenError
 
 def setup_error_handlers(app):
     @app.exception_handler(CustomHTTPException)
@@ -43,6 +43,21 @@ def setup_error_handlers(app):
             }
         )
 
+    @app.exception_handler(CircuitOpenError)
+    async def circuit_open_handler(request: Request, exc: CircuitOpenError):
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status_code": 503,
+                "data": {
+                    "provider": exc.provider,
+                    "developer_message": "Upstream provider circuit is open",
+                    "user_message": exc.message,
+                    "error_code": "PROVIDER_UNAVAILABLE"
+                }
+            }
+        )
+
     @app.exception_handler(StockAPIError)
     async def stock_api_error_handler(request: Request, exc: StockAPIError):
         return JSONResponse(
@@ -1,18 +1,34 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request
 from src.services.financial_data_provider import FinancialDataProvider
-from src.models.stock import StockInfo, IntrinsicValue
+from src.models.stock import StockInfo, IntrinsicValue, BatchStockResult, BatchStockRequest, PriceHistory, SensitivityGrid, \
+    MonteCarloRequest, MonteCarloResult, ReverseDCFRequest, ImpliedRate, ImpliedRateResult
+from src.models.errors import CustomHTTPException, StockNotFoundError
+from src.models.validators import Ticker
 from src.services.dcf_calculator import DCFCalculator
+from src.services.dcf_simulation import MonteCarloDCF, get_simulation_executor
+from src.services.reverse_dcf import ReverseDCF
 from src.config import get_settings
-from src.api.dependencies import get_financial_provider
+from src.api.dependencies import get_financial_provider, get_provider_router
 from loguru import logger
-from fastapi_cache.decorator import cache
+from src.cache.decorator import cache, refreshes_in_flight
+from src.cache.coder import coder_stats
+from src.cache.keys import key_patterns, normalize_ticker
+from src.cache.metrics import cache_metrics
+from src.services.yahoo_snapshot import get_snapshot_store
+from src.services.fundamentals_store import get_fundamentals_store
+from src.services.downsampling import INTERVAL_UNITS, minmax_downsample, resample_last
+import numpy as np
 from datetime import timedelta
 from fastapi_cache import FastAPICache
 from src.services.alpha_vantage_provider import AlphaVantageProvider
-from src.services.yahoo_finance_provider import YahooFinanceProvider
 from src.services.moat_analyzer import MoatAnalyzer
+from src.services.blocking_executor import get_yfinance_executor
+from src.services.upstream_scheduler import get_upstream_scheduler
+from src.services.batch_quotes import BatchQuoteService
+import asyncio
+import math
 import httpx
-from typing import List, Dict, Any
+from typing import Awaitable, Callable, List, Dict, Any, Optional
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/v1")
@@ -27,48 +43,364 @@ async def analyze_data():
     return {"result": {}, "status": "success"}
 
 @router.get("/stock/{ticker}", response_model=StockInfo)
-@cache(expire=timedelta(hours=1))
+@cache(expire=timedelta(hours=1), stale=timedelta(minutes=15))
 async def get_stock_info(
-    ticker: str,
+    ticker: Ticker,
     financial_provider: FinancialDataProvider = Depends(get_financial_provider)
 ):
     logger.debug(f"@rayjosong Processing stock info request for {ticker}")
     return await financial_provider.get_stock_info(ticker)
 
+async def _get_stock_batch(tickers: List[str], financial_provider: FinancialDataProvider) -> List[BatchStockResult]:
+    try:
+        return await BatchQuoteService(financial_provider).get_stock_infos(tickers)
+    except ValueError as e:
+        raise CustomHTTPException(400, {
+            "developer_message": str(e),
+            "user_message": "Too many tickers requested",
+            "error_code": "BATCH_TOO_LARGE"
+        })
+
+@router.get("/stocks", response_model=List[BatchStockResult])
+async def get_stocks(
+    tickers: str = Query(..., description="Comma-separated list of tickers"),
+    financial_provider: FinancialDataProvider = Depends(get_financial_provider)
+):
+    logger.debug(f"@rayjosong Processing batch stock request for {tickers}")
+    return await _get_stock_batch(tickers.split(","), financial_provider)
+
+@router.post("/stocks", response_model=List[BatchStockResult])
+async def post_stocks(
+    request: BatchStockRequest,
+    financial_provider: FinancialDataProvider = Depends(get_financial_provider)
+):
+    logger.debug(f"@rayjosong Processing batch stock request for {len(request.tickers)} tickers")
+    return await _get_stock_batch(request.tickers, financial_provider)
+
+PRICE_PERIODS = ("5d", "1mo", "3mo", "6mo", "ytd", "1y", "2y", "5y", "10y", "max")
+
+@router.get("/stock/{ticker}/price-history", response_model=PriceHistory)
+async def get_price_history(
+    ticker: Ticker,
+    period: str = Query("1mo", description="One of 5d, 1mo, 3mo, 6mo, ytd, 1y, 2y, 5y, 10y, max"),
+    interval: str = Query("1d", description="One of 1d, 1wk, 1mo"),
+    max_points: int = Query(500, ge=10, le=5000),
+    financial_provider: FinancialDataProvider = Depends(get_financial_provider)
+):
+    logger.debug(f"@rayjosong Processing price history request for {ticker} ({period}, {interval})")
+    if period not in PRICE_PERIODS or interval not in INTERVAL_UNITS:
+        raise CustomHTTPException(400, {
+            "developer_message": f"Unsupported period {period} or interval {interval}",
+            "user_message": "Unsupported chart range",
+            "error_code": "INVALID_PRICE_RANGE"
+        })
+
+    series = await financial_provider.get_historical_data(ticker, period)
+    if not len(series):
+        raise StockNotFoundError(ticker)
+
+    sampled = resample_last(series.date, interval)
+    closes = series.close[sampled]
+    keep = sampled[minmax_downsample(closes, max_points)]
+    first, last = float(series.close[0]), float(series.close[-1])
+    return PriceHistory(
+        ticker=ticker,
+        period=period,
+        interval=interval,
+        dates=np.datetime_as_string(series.date[keep], unit="D").tolist(),
+        prices=series.close[keep].tolist(),
+        current_price=last,
+        percent_change=(last - first) / first * 100 if first else 0.0,
+        source_points=len(sampled)
+    )
+
+# Not cached as a whole: the price comes from the short-lived quote cache, the FCF and share
+# count from the hourly caches, and the DCF part is memoized in process by its inputs
 @router.get("/stock/{ticker}/intrinsic-value", response_model=IntrinsicValue)
-@cache(expire=timedelta(minutes=30), namespace="api_intrinsic_value")
 async def get_intrinsic_value(
-    ticker: str,
+    ticker: Ticker,
     financial_provider: FinancialDataProvider = Depends(get_financial_provider)
 ):
     logger.debug(f"@rayjosong Processing intrinsic value request for {ticker}")
     calculator = DCFCalculator()
-    stock_data = await financial_provider.get_stock_info(ticker)
-    financial_metrics = await financial_provider.get_financial_metrics(ticker)
+    current_price, stock_data, financial_metrics = await asyncio.gather(
+        financial_provider.get_current_price(ticker),
+        financial_provider.get_stock_info(ticker),
+        financial_provider.get_financial_metrics(ticker)
+    )
+    # Shares outstanding barely move within the hour, so the cached market cap is rescaled to the live price
+    market_cap = stock_data.market_cap * current_price / stock_data.current_price \
+        if stock_data.market_cap and stock_data.current_price else None
     
     return await calculator.calculate_intrinsic_value(ticker, {
         "fcf": financial_metrics["fcf"],
-        "current_price": stock_data.current_price
+        "current_price": current_price,
+        "market_cap": market_cap
     })
 
+MAX_SENSITIVITY_CELLS = 10000
+# Rates are fractions in [0, 1], so this also bounds each axis to 10001 points
+MIN_RATE_STEP = 1e-4
+
+def _axis_length(name: str, start: float, stop: float, step: float) -> int:
+    """Number of rates from start to stop inclusive, checked before anything is allocated"""
+    if stop < start:
+        raise CustomHTTPException(400, {
+            "developer_message": f"{name}_max must not be below {name}_min",
+            "user_message": "Invalid sensitivity range",
+            "error_code": "INVALID_SENSITIVITY_GRID"
+        })
+    # Tolerate float error so e.g. 0.04..0.16 by 0.02 includes 0.16
+    return math.floor((stop - start) / step + 1e-9) + 1
+
+def _rate_axis(start: float, step: float, length: int) -> np.ndarray:
+    # Rounded so float steps give the rates a user would type
+    return np.round(start + step * np.arange(length), 6)
+
+def _nullable(values: np.ndarray) -> List[Any]:
+    cells = values.astype(object)
+    cells[~np.isfinite(values)] = None
+    return cells.tolist()
+
+@router.get("/stock/{ticker}/intrinsic-value/sensitivity", response_model=SensitivityGrid)
+async def get_intrinsic_value_sensitivity(
+    ticker: Ticker,
+    growth_min: float = Query(0.04, ge=0, le=1),
+    growth_max: float = Query(0.16, ge=0, le=1),
+    growth_step: float = Query(0.02, ge=MIN_RATE_STEP),
+    discount_min: float = Query(0.06, ge=0, le=1),
+    discount_max: float = Query(0.14, ge=0, le=1),
+    discount_step: float = Query(0.01, ge=MIN_RATE_STEP),
+    terminal_min: float = Query(0.02, ge=0, le=1),
+    terminal_max: Optional[float] = Query(None, ge=0, le=1, description="Set to add a terminal rate axis"),
+    terminal_step: float = Query(0.01, ge=MIN_RATE_STEP),
+    projection_years: int = Query(5, ge=3, le=10),
+    financial_provider: FinancialDataProvider = Depends(get_financial_provider)
+):
+    """Intrinsic value over a growth × discount grid, or terminal × growth × discount when terminal_max is set"""
+    logger.debug(f"@rayjosong Processing intrinsic value sensitivity request for {ticker}")
+    growth_count = _axis_length("growth", growth_min, growth_max, growth_step)
+    discount_count = _axis_length("discount", discount_min, discount_max, discount_step)
+    terminal_count = _axis_length("terminal", terminal_min, terminal_max, terminal_step) \
+        if terminal_max is not None else 1
+
+    cells = growth_count * discount_count * terminal_count
+    if cells > MAX_SENSITIVITY_CELLS:
+        raise CustomHTTPException(400, {
+            "developer_message": f"Grid has {cells} cells, limit is {MAX_SENSITIVITY_CELLS}",
+            "user_message": "Sensitivity grid is too large",
+            "error_code": "INVALID_SENSITIVITY_GRID"
+        })
+
+    growth_rates = _rate_axis(growth_min, growth_step, growth_count)
+    discount_rates = _rate_axis(discount_min, discount_step, discount_count)
+    terminal_rates = _rate_axis(terminal_min, terminal_step, terminal_count)
+
+    stock_data, financial_metrics = await financial_provider.get_valuation_inputs(ticker)
+    grid = DCFCalculator().sensitivity_grid(
+        financial_metrics["fcf"], growth_rates, discount_rates, terminal_rates, projection_years
+    )
+    intrinsic_values = grid.intrinsic_value
+    # The DCF values the whole company, so upside is against market cap (null cells when it is unknown)
+    upside = grid.upside(stock_data.market_cap or np.nan)
+    dimensions = ["terminal_rate", "growth_rate", "discount_rate"]
+    if terminal_max is None:
+        intrinsic_values, upside, dimensions = intrinsic_values[0], upside[0], dimensions[1:]
+
+    return SensitivityGrid(
+        ticker=ticker,
+        current_price=stock_data.current_price,
+        market_cap=stock_data.market_cap,
+        base_fcf=financial_metrics["fcf"],
+        projection_years=projection_years,
+        dimensions=dimensions,
+        growth_rates=growth_rates.tolist(),
+        discount_rates=discount_rates.tolist(),
+        terminal_rates=terminal_rates.tolist(),
+        intrinsic_values=_nullable(intrinsic_values),
+        upside=_nullable(upside)
+    )
+
+@router.post("/intrinsic-value/monte-carlo", response_model=List[MonteCarloResult])
+async def post_monte_carlo_valuation(
+    request: MonteCarloRequest,
+    financial_provider: FinancialDataProvider = Depends(get_financial_provider)
+):
+    """Distribution of intrinsic values per ticker from sampled DCF assumptions"""
+    settings = get_settings()
+    tickers = list(dict.fromkeys(normalize_ticker(ticker) for ticker in request.tickers))
+    if len(tickers) > settings.monte_carlo_max_tickers or request.paths > settings.monte_carlo_max_paths:
+        raise CustomHTTPException(400, {
+            "developer_message": f"At most {settings.monte_carlo_max_tickers} tickers and " +
+                                 f"{settings.monte_carlo_max_paths} paths per request",
+            "user_message": "Simulation request is too large",
+            "error_code": "SIMULATION_TOO_LARGE"
+        })
+    logger.debug(f"@rayjosong Processing Monte Carlo request for {len(tickers)} tickers, {request.paths} paths")
+
+    simulator = MonteCarloDCF()
+    executor = get_simulation_executor()
+
+    async def simulate(ticker: str) -> MonteCarloResult:
+        try:
+            stock_data, financial_metrics = await financial_provider.get_valuation_inputs(ticker)
+            valuation = await executor.run(
+                simulator.simulate, ticker, financial_metrics["fcf"], stock_data.current_price, stock_data.market_cap,
+                request.growth_rate, request.discount_rate, request.terminal_rate, request.paths,
+                request.projection_years, request.seed, request.histogram_bins,
+                operation=f"monte_carlo {ticker}"
+            )
+            return MonteCarloResult(ticker=ticker, data=valuation)
+        except Exception as e:
+            logger.warning(f"@rayjosong Monte Carlo valuation failed for {ticker}: {str(e)}")
+            return MonteCarloResult(ticker=ticker, error=str(e))
+
+    return await asyncio.gather(*(simulate(ticker) for ticker in tickers))
+
+@router.post("/intrinsic-value/implied", response_model=List[ImpliedRateResult])
+async def post_implied_rates(
+    request: ReverseDCFRequest,
+    financial_provider: FinancialDataProvider = Depends(get_financial_provider)
+):
+    """Reverse DCF: the growth (or discount) rate each ticker's price implies, solved for all tickers at once"""
+    settings = get_settings()
+    tickers = list(dict.fromkeys(normalize_ticker(ticker) for ticker in request.tickers))
+    if len(tickers) > settings.batch_max_tickers:
+        raise CustomHTTPException(400, {
+            "developer_message": f"At most {settings.batch_max_tickers} tickers per request",
+            "user_message": "Too many tickers requested",
+            "error_code": "BATCH_TOO_LARGE"
+        })
+    logger.debug(f"@rayjosong Processing implied {request.solve_for} request for {len(tickers)} tickers")
+
+    outcomes = await asyncio.gather(*(financial_provider.get_valuation_inputs(ticker) for ticker in tickers),
+                                    return_exceptions=True)
+    errors = {ticker: outcome for ticker, outcome in zip(tickers, outcomes) if isinstance(outcome, Exception)}
+    inputs = dict(zip(tickers, outcomes))
+    targets = {normalize_ticker(ticker): value for ticker, value in request.targets.items()}
+    # The DCF values the whole company, so the default target is market cap rather than the share price
+    for ticker in tickers:
+        if ticker not in errors:
+            targets.setdefault(ticker, inputs[ticker][0].market_cap)
+            if targets[ticker] is None:
+                errors[ticker] = ValueError(f"No market cap available for {ticker}; pass a target value")
+    solvable = [ticker for ticker in tickers if ticker not in errors]
+
+    base_fcf = np.array([inputs[ticker][1]["fcf"] for ticker in solvable], dtype="f8")
+    target_values = np.array([targets[ticker] for ticker in solvable], dtype="f8")
+    solution = ReverseDCF().solve(
+        request.solve_for, base_fcf, target_values, request.growth_rate, request.discount_rate,
+        request.terminal_rate, request.projection_years
+    )
+
+    solved = {}
+    for i, ticker in enumerate(solvable):
+        converged = bool(solution["converged"][i])
+        solved[ticker] = ImpliedRateResult(ticker=ticker, data=ImpliedRate(
+            ticker=ticker,
+            solve_for=request.solve_for,
+            implied_rate=float(solution["rate"][i]) if converged else None,
+            target_value=float(target_values[i]),
+            base_fcf=float(base_fcf[i]),
+            status=str(solution["status"][i]),
+            converged=converged,
+            iterations=int(solution["iterations"][i]),
+            residual=float(solution["residual"][i]) if converged else None,
+            bounds=list(solution["bounds"])
+        ))
+    return [solved.get(ticker) or ImpliedRateResult(ticker=ticker, error=str(errors[ticker])) for ticker in tickers]
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    backend = FastAPICache.get_backend()
+    stats = backend.stats() if hasattr(backend, "stats") else {}
+    return {
+        **stats,
+        "refreshes_in_flight": refreshes_in_flight(),
+        "coder": coder_stats.to_dict(),
+        "namespaces": cache_metrics.snapshot(),
+        "redis": await backend.redis_info() if hasattr(backend, "redis_info") else {}
+    }
+
+@router.get("/cache/keys")
+async def get_cache_keys(
+    ticker: Optional[Ticker] = None,
+    namespace: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """TTL and size of cached keys for a ticker and/or namespace"""
+    patterns = key_patterns(FastAPICache.get_prefix(), ticker=ticker, namespace=namespace)
+    keys = await FastAPICache.get_backend().inspect(patterns, limit)
+    return {"count": len(keys), "keys": keys}
+
 @router.get("/cache/check/{ticker}")
-async def check_cache(ticker: str):
-    cache_key = f"financial_data:{ticker}"
-    value = await FastAPICache.get_backend().get(cache_key)
-    return {"cache_key": cache_key, "exists": value is not None}
+async def check_cache(ticker: Ticker):
+    keys = await FastAPICache.get_backend().inspect(key_patterns(FastAPICache.get_prefix(), ticker=ticker))
+    return {"ticker": normalize_ticker(ticker), "exists": bool(keys), "keys": keys}
+
+@router.delete("/cache/tickers/{ticker}")
+async def invalidate_ticker(ticker: Ticker):
+    """Drop everything cached for a ticker, e.g. after an earnings release"""
+    patterns = key_patterns(FastAPICache.get_prefix(), ticker=ticker)
+    cleared = await FastAPICache.get_backend().clear_patterns(patterns)
+    snapshot = get_snapshot_store().invalidate(ticker)
+    fallbacks = get_provider_router().forget(ticker)
+    fundamentals = get_fundamentals_store().forget_checks(ticker)
+    logger.info(f"@rayjosong Invalidated {cleared} cache keys for {ticker}")
+    return {"ticker": normalize_ticker(ticker), "cleared_keys": cleared,
+            "cleared_snapshot": snapshot, "cleared_fallbacks": fallbacks, "cleared_fundamentals_checks": fundamentals}
+
+@router.delete("/cache/namespaces/{namespace}")
+async def invalidate_namespace(namespace: str):
+    patterns = key_patterns(FastAPICache.get_prefix(), namespace=namespace)
+    cleared = await FastAPICache.get_backend().clear_patterns(patterns)
+    logger.info(f"@rayjosong Invalidated {cleared} cache keys in namespace {namespace}")
+    return {"namespace": namespace, "cleared_keys": cleared}
+
+@router.get("/metrics/executors")
+async def get_executor_metrics():
+    return {"yfinance": get_yfinance_executor().stats(), "dcf_simulation": get_simulation_executor().stats()}
+
+@router.get("/metrics/scheduler")
+async def get_scheduler_metrics():
+    return get_upstream_scheduler().stats()
+
+@router.get("/metrics/warmer")
+async def get_warmer_metrics(request: Request):
+    warmer = getattr(request.app.state, "cache_warmer", None)
+    return warmer.stats() if warmer else {"enabled": False}
+
+@router.get("/metrics/fundamentals")
+async def get_fundamentals_metrics():
+    return get_fundamentals_store().stats()
+
+@router.get("/metrics/providers")
+async def get_provider_metrics():
+    return get_provider_router().get_stats()
 
 @router.get("/financials/{ticker}")
-@cache(expire=timedelta(hours=1))
-async def get_financial_metrics(ticker: str):
-    provider = YahooFinanceProvider()
-    return await provider.get_financial_metrics(ticker)
+@cache(expire=timedelta(hours=1), stale=timedelta(hours=6))
+async def get_financial_metrics(
+    ticker: Ticker,
+    financial_provider: FinancialDataProvider = Depends(get_financial_provider)
+):
+    return await financial_provider.get_financial_metrics(ticker)
 
 @router.get("/moat-analysis/{ticker}")
-@cache(expire=timedelta(hours=24))
+@cache(expire=timedelta(hours=24), stale=timedelta(hours=24))
 async def get_moat_analysis(
-    ticker: str,
+    ticker: Ticker,
     financial_provider: FinancialDataProvider = Depends(get_financial_provider)
 ) -> Dict[str, Any]:
     logger.debug(f"@rayjosong Processing moat analysis for {ticker}")
     analyzer = MoatAnalyzer(financial_provider)
     return await analyzer.analyze_moat(ticker)
+
+def get_warm_targets(financial_provider: FinancialDataProvider) -> Dict[str, Callable[[str], Awaitable[Any]]]:
+    """Cached routes the cache warmer can call directly; keys match real requests"""
+    return {
+        "stock_info": lambda ticker: get_stock_info(ticker=ticker, financial_provider=financial_provider),
+        "financial_metrics": lambda ticker: get_financial_metrics(ticker=ticker, financial_provider=financial_provider),
+        "intrinsic_value": lambda ticker: get_intrinsic_value(ticker=ticker, financial_provider=financial_provider),
+        "moat_analysis": lambda ticker: get_moat_analysis(ticker=ticker, financial_provider=financial_provider)
+    }
@@ -0,0 +1,350 @@
+from typing import Any, Dict, List, Optional, Set, Tuple
+import asyncio
+import fnmatch
+import json
+import time
+import uuid
+from fastapi_cache.backends import Backend
+from fastapi_cache.backends.redis import RedisBackend
+from loguru import logger
+from redis.asyncio import Redis
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+from .local import Expire, LocalTTLCache, expire_seconds
+
+class TwoTierBackend(Backend):
+    """fastapi_cache backend with an in-process LRU (L1) in front of Redis (L2).
+
+    Writes go to both tiers and publish an invalidation on a Redis channel so
+    other workers drop their L1 copy. L1 entries also never outlive
+    ``l1_ttl`` seconds, which bounds staleness if an invalidation is missed.
+
+    If Redis is unreachable, times out or fails its health ping, the backend degrades
+    to L1 only: reads and writes stay in memory, keeping their full TTL, and
+    Redis is not touched on the request path. Once pings succeed again, keys
+    written during the outage are copied back to Redis before it is used.
+    """
+
+    def __init__(self, redis: Redis, l1: LocalTTLCache, l1_ttl: float, channel: str,
+                 health_interval: float = 2.0, health_timeout: float = 0.5):
+        self.redis = redis
+        self.l2 = RedisBackend(redis)
+        self.l1 = l1
+        self.l1_ttl = l1_ttl
+        self.channel = channel
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.origin = uuid.uuid4().hex
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.redis_healthy = True
+        self.degraded_since: Optional[float] = None
+        self.degradations = 0
+        self._dirty: Set[str] = set()
+        self._listener: Optional[asyncio.Task] = None
+        self._monitor: Optional[asyncio.Task] = None
+
+    def _degrade(self, error: Exception) -> None:
+        if not isinstance(error, (RedisConnectionError, RedisTimeoutError, TimeoutError, OSError)):
+            # Redis answered (or the command never left the client); it is not down
+            logger.warning(f"@rayjosong Redis rejected cache command: {str(error)}")
+            return
+        if self.redis_healthy:
+            logger.error(f"@rayjosong Redis unavailable, serving cache from memory only: {str(error)}")
+            self.redis_healthy = False
+            self.degraded_since = time.monotonic()
+            self.degradations += 1
+
+    def _fill_l1(self, key: str, value: bytes, ttl: Optional[float]) -> None:
+        if ttl is None or ttl < 0:
+            ttl = self.l1_ttl
+        # Report the entry's real TTL but drop the local copy after l1_ttl
+        self.l1.set(key, value, ttl, max_age=self.l1_ttl)
+
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[bytes]]:
+        local = self.l1.get(key)
+        if local is not None:
+            self.l1_hits += 1
+            return local
+
+        if self.redis_healthy:
+            try:
+                ttl, value = await self.l2.get_with_ttl(key)
+            except Exception as e:
+                self._degrade(e)
+            else:
+                if value is not None:
+                    self.l2_hits += 1
+                    self._fill_l1(key, value, ttl)
+                    return ttl, value
+
+        self.misses += 1
+        return 0, None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return (await self.get_with_ttl(key))[1]
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        values: Dict[str, Optional[bytes]] = {}
+        for key in keys:
+            local = self.l1.get(key)
+            if local is not None:
+                self.l1_hits += 1
+                values[key] = local[1]
+
+        missing = [key for key in keys if key not in values]
+        fetched: List[Optional[bytes]] = [None] * len(missing)
+        if missing and self.redis_healthy:
+            try:
+                fetched = await self.redis.mget(missing)
+            except Exception as e:
+                self._degrade(e)
+
+        for key, value in zip(missing, fetched):
+            values[key] = value
+            if value is None:
+                self.misses += 1
+            else:
+                self.l2_hits += 1
+                self._fill_l1(key, value, None)
+        return [values[key] for key in keys]
+
+    def _publish(self, pipe, op: str, target: Any) -> None:
+        pipe.publish(self.channel, json.dumps({"origin": self.origin, "op": op, "target": target}))
+
+    async def set(self, key: str, value: bytes, expire: Expire = None) -> None:
+        await self.set_many({key: value}, expire)
+
+    async def set_many(self, items: Dict[str, bytes], expire: Expire = None) -> None:
+        seconds = expire_seconds(expire)
+        if self.redis_healthy:
+            for key, value in items.items():
+                self._fill_l1(key, value, seconds)
+            try:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    for key, value in items.items():
+                        # Redis only takes whole units, so expiry goes in milliseconds
+                        pipe.set(key, value, px=int(seconds * 1000) if seconds else None)
+                        self._publish(pipe, "key", key)
+                    await pipe.execute()
+                return
+            except Exception as e:
+                self._degrade(e)
+
+        # Memory is the only tier for now, so keep the full TTL and remember
+        # the key for copying back to Redis once it recovers
+        for key, value in items.items():
+            self.l1.set(key, value, seconds if seconds is not None else self.l1_ttl)
+            self._dirty.add(key)
+        if len(self._dirty) > self.l1.max_entries:
+            self._dirty = {key for key in self._dirty if key in self.l1}
+
+    async def clear(self, namespace: Optional[str] = None, key: Optional[str] = None) -> int:
+        if namespace:
+            cleared = self.l1.clear_prefix(f"{namespace}:")
+            self._dirty = {dirty for dirty in self._dirty if not dirty.startswith(f"{namespace}:")}
+            op, target = "prefix", f"{namespace}:"
+        elif key:
+            cleared = int(self.l1.delete(key))
+            self._dirty.discard(key)
+            op, target = "key", key
+        else:
+            return 0
+
+        if not self.redis_healthy:
+            return cleared
+        try:
+            if op == "prefix":
+                cleared = await self._delete_matching(f"{namespace}:*")
+            else:
+                cleared = await self.l2.clear(key=key)
+            async with self.redis.pipeline(transaction=False) as pipe:
+                self._publish(pipe, op, target)
+                await pipe.execute()
+        except Exception as e:
+            self._degrade(e)
+        return cleared
+
+    async def clear_patterns(self, patterns: List[str]) -> int:
+        """Drop every key matching any glob pattern from both tiers, e.g. all keys for one ticker"""
+        cleared = self.l1.clear_matching(patterns)
+        self._dirty = {key for key in self._dirty if not any(fnmatch.fnmatchcase(key, p) for p in patterns)}
+        if not self.redis_healthy:
+            return cleared
+        try:
+            cleared = 0
+            for pattern in patterns:
+                cleared += await self._delete_matching(pattern)
+            async with self.redis.pipeline(transaction=False) as pipe:
+                self._publish(pipe, "patterns", patterns)
+                await pipe.execute()
+        except Exception as e:
+            self._degrade(e)
+        return cleared
+
+    async def inspect(self, patterns: List[str], limit: int = 100) -> List[Dict[str, Any]]:
+        """TTL, size and tier of keys matching any glob pattern, at most ``limit`` of them"""
+        entries: Dict[str, Dict[str, Any]] = {}
+        for key, ttl, size in self.l1.items(patterns):
+            entries[key] = {"key": key, "ttl": ttl, "bytes": size, "l1": True, "l2": False}
+
+        if self.redis_healthy:
+            try:
+                keys: List[str] = []
+                for pattern in patterns:
+                    async for key in self.redis.scan_iter(match=pattern, count=500):
+                        keys.append(key.decode() if isinstance(key, bytes) else key)
+                        if len(keys) >= limit:
+                            break
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    for key in keys:
+                        pipe.ttl(key)
+                        pipe.strlen(key)
+                    replies = await pipe.execute()
+                for index, key in enumerate(keys):
+                    ttl, size = replies[2 * index], replies[2 * index + 1]
+                    entry = entries.setdefault(key, {"key": key, "l1": False})
+                    # Redis holds the authoritative TTL; L1 copies are capped shorter
+                    entry.update({"ttl": ttl, "bytes": size, "l2": True})
+            except Exception as e:
+                self._degrade(e)
+        return sorted(entries.values(), key=lambda entry: entry["key"])[:limit]
+
+    async def redis_info(self) -> Dict[str, Any]:
+        if not self.redis_healthy:
+            return {}
+        try:
+            memory, stats = await asyncio.gather(self.redis.info("memory"), self.redis.info("stats"))
+        except Exception as e:
+            self._degrade(e)
+            return {}
+        return {
+            "used_memory": memory.get("used_memory"),
+            "maxmemory": memory.get("maxmemory"),
+            "evicted_keys": stats.get("evicted_keys"),
+            "expired_keys": stats.get("expired_keys"),
+            "keyspace_hits": stats.get("keyspace_hits"),
+            "keyspace_misses": stats.get("keyspace_misses")
+        }
+
+    async def _delete_matching(self, pattern: str) -> int:
+        """SCAN-based delete so clearing a namespace never blocks Redis like KEYS does"""
+        cleared = 0
+        batch: List[bytes] = []
+        async for key in self.redis.scan_iter(match=pattern, count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                cleared += await self.redis.delete(*batch)
+                batch = []
+        if batch:
+            cleared += await self.redis.delete(*batch)
+        return cleared
+
+    def _apply_invalidation(self, message: Dict[str, Any]) -> None:
+        if message.get("origin") == self.origin:
+            return
+        if message.get("op") == "prefix":
+            self.l1.clear_prefix(message["target"])
+        elif message.get("op") == "patterns":
+            self.l1.clear_matching(message["target"])
+        else:
+            self.l1.delete(message["target"])
+
+    async def _listen(self) -> None:
+        while True:
+            if not self.redis_healthy:
+                await asyncio.sleep(self.health_interval)
+                continue
+            try:
+                pubsub = self.redis.pubsub()
+                await pubsub.subscribe(self.channel)
+                # Invalidations may have been missed while unsubscribed
+                self.l1.clear()
+                logger.info(f"@rayjosong Subscribed to cache invalidations on {self.channel}")
+                async with pubsub:
+                    while self.redis_healthy:
+                        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                        if message is not None:
+                            self._handle_message(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._degrade(e)
+                # Back off before resubscribing so a persistent error cannot spin the loop
+                await asyncio.sleep(self.health_interval)
+
+    def _handle_message(self, data: Any) -> None:
+        """Apply one invalidation; a malformed publish is skipped rather than breaking the listener"""
+        try:
+            self._apply_invalidation(json.loads(data))
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            logger.warning(f"@rayjosong Ignoring malformed cache invalidation {data!r}: {str(e)}")
+
+    async def _reattach(self) -> None:
+        """Copy keys written during the outage back to Redis, then resume using it"""
+        warmed = 0
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in self._dirty:
+                local = self.l1.get(key)
+                if local is None:
+                    continue
+                ttl, value = local
+                pipe.set(key, value, ex=max(ttl, 1))
+                self._publish(pipe, "key", key)
+                warmed += 1
+            await pipe.execute()
+        outage = time.monotonic() - self.degraded_since if self.degraded_since else 0.0
+        logger.info(f"@rayjosong Redis healthy again after {outage:.1f}s, warmed {warmed} keys from memory")
+        self._dirty.clear()
+        self.degraded_since = None
+        self.redis_healthy = True
+
+    async def _monitor_health(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            try:
+                await asyncio.wait_for(self.redis.ping(), self.health_timeout)
+                if not self.redis_healthy:
+                    await self._reattach()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._degrade(e)
+
+    async def start(self) -> None:
+        try:
+            await asyncio.wait_for(self.redis.ping(), self.health_timeout)
+        except Exception as e:
+            self._degrade(e)
+        if self._listener is None:
+            self._listener = asyncio.ensure_future(self._listen())
+        if self._monitor is None:
+            self._monitor = asyncio.ensure_future(self._monitor_health())
+
+    async def stop(self) -> None:
+        for task in (self._listener, self._monitor):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._listener = None
+        self._monitor = None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.l1_hits + self.l2_hits + self.misses
+        return {
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "l1_hit_ratio": round(self.l1_hits / lookups, 4) if lookups else 0.0,
+            "l2_hit_ratio": round(self.l2_hits / lookups, 4) if lookups else 0.0,
+            "l1_entries": len(self.l1),
+            "l1_bytes": self.l1.bytes,
+            "l1_evictions": self.l1.evictions,
+            "redis_healthy": self.redis_healthy,
+            "degraded_seconds": round(time.monotonic() - self.degraded_since, 1) if self.degraded_since else 0.0,
+            "degradations": self.degradations,
+            "pending_warm_keys": len(self._dirty)
+        }
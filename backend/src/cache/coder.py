@@ -0,0 +1,231 @@
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+import base64
+import json
+import struct
+import time
+import zlib
+import numpy as np
+from fastapi_cache.coder import Coder
+from pydantic import BaseModel
+from src.cache.keys import CACHE_SCHEMA_VERSION
+from src.config import get_settings
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+class CacheDecodeError(ValueError):
+    """Cached bytes were written by an incompatible coder or schema; treat as a miss"""
+
+# Header: magic, schema version, payload format, compression
+_MAGIC = b"\xca"
+_HEADER = struct.Struct(">cHcc")
+
+_FORMAT_MSGPACK = b"M"
+_FORMAT_JSON = b"J"
+
+_COMPRESS_NONE = b"-"
+_COMPRESS_ZSTD = b"z"
+_COMPRESS_LZ4 = b"l"
+_COMPRESS_ZLIB = b"d"
+
+_EXT_NDARRAY = 1
+_EXT_DATETIME = 2
+_EXT_DATE = 3
+
+class CoderStats:
+    def __init__(self):
+        self.encodes = 0
+        self.decodes = 0
+        self.encode_seconds = 0.0
+        self.decode_seconds = 0.0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        self.compressed = 0
+        self.decode_errors = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "encodes": self.encodes,
+            "decodes": self.decodes,
+            "avg_encode_us": round(self.encode_seconds / self.encodes * 1e6, 1) if self.encodes else 0.0,
+            "avg_decode_us": round(self.decode_seconds / self.decodes * 1e6, 1) if self.decodes else 0.0,
+            "raw_bytes": self.raw_bytes,
+            "stored_bytes": self.stored_bytes,
+            "compression_ratio": round(self.raw_bytes / self.stored_bytes, 3) if self.stored_bytes else 0.0,
+            "compressed_values": self.compressed,
+            "decode_errors": self.decode_errors
+        }
+
+coder_stats = CoderStats()
+
+def _pack_array(array: np.ndarray) -> bytes:
+    array = np.ascontiguousarray(array)
+    meta = json.dumps({"dtype": array.dtype.str, "shape": array.shape}).encode()
+    return struct.pack(">I", len(meta)) + meta + array.tobytes()
+
+def _unpack_array(data: bytes) -> np.ndarray:
+    (size,) = struct.unpack_from(">I", data)
+    meta = json.loads(data[4:4 + size])
+    # Read-only view over the decoded buffer, no copy
+    return np.frombuffer(data, dtype=np.dtype(meta["dtype"]), offset=4 + size).reshape(meta["shape"])
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="python")
+    if isinstance(value, np.ndarray):
+        return msgpack.ExtType(_EXT_NDARRAY, _pack_array(value))
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, datetime):
+        return msgpack.ExtType(_EXT_DATETIME, value.isoformat().encode())
+    if isinstance(value, date):
+        return msgpack.ExtType(_EXT_DATE, value.isoformat().encode())
+    raise TypeError(f"Cannot encode {type(value).__name__} for the cache")
+
+def _msgpack_ext_hook(code: int, data: bytes) -> Any:
+    if code == _EXT_NDARRAY:
+        return _unpack_array(data)
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    if code == _EXT_DATE:
+        return date.fromisoformat(data.decode())
+    return msgpack.ExtType(code, data)
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="python")
+    if isinstance(value, np.ndarray):
+        return {"__ndarray__": base64.b64encode(_pack_array(value)).decode()}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    raise TypeError(f"Cannot encode {type(value).__name__} for the cache")
+
+def _json_object_hook(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1:
+        if "__ndarray__" in obj:
+            return _unpack_array(base64.b64decode(obj["__ndarray__"]))
+        if "__datetime__" in obj:
+            return datetime.fromisoformat(obj["__datetime__"])
+        if "__date__" in obj:
+            return date.fromisoformat(obj["__date__"])
+    return obj
+
+def _json_keys(value: Any) -> Any:
+    # JSON objects only take string keys, e.g. Timestamp-indexed history dicts
+    if isinstance(value, dict):
+        return {k.isoformat() if isinstance(k, (datetime, date)) else k: _json_keys(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_keys(v) for v in value]
+    return value
+
+def _compression() -> bytes:
+    preferred = get_settings().cache_compression
+    if preferred == "none":
+        return _COMPRESS_NONE
+    if preferred in ("auto", "zstd") and zstandard is not None:
+        return _COMPRESS_ZSTD
+    if preferred in ("auto", "lz4") and lz4_frame is not None:
+        return _COMPRESS_LZ4
+    return _COMPRESS_ZLIB
+
+def _compress(method: bytes, payload: bytes) -> bytes:
+    if method == _COMPRESS_ZSTD:
+        return zstandard.ZstdCompressor(level=3).compress(payload)
+    if method == _COMPRESS_LZ4:
+        return lz4_frame.compress(payload)
+    return zlib.compress(payload, 6)
+
+def _decompress(method: bytes, payload: bytes) -> bytes:
+    if method == _COMPRESS_NONE:
+        return payload
+    if method == _COMPRESS_ZSTD and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompress(payload)
+    if method == _COMPRESS_LZ4 and lz4_frame is not None:
+        return lz4_frame.decompress(payload)
+    if method == _COMPRESS_ZLIB:
+        return zlib.decompress(payload)
+    raise CacheDecodeError(f"Compression {method!r} is not available in this process")
+
+class BinaryCoder(Coder):
+    """Compact cache coder: msgpack when installed (JSON otherwise), tagged with
+    the cache schema version and compressed above ``cache_compress_min_bytes``.
+
+    Pydantic models are stored as plain fields and rebuilt with
+    ``model_validate`` when the return type is a model; numpy arrays are stored
+    as raw buffers and decoded as zero-copy views.
+    """
+
+    @classmethod
+    def encode(cls, value: Any) -> bytes:
+        started = time.perf_counter()
+        if msgpack is not None:
+            fmt = _FORMAT_MSGPACK
+            payload = msgpack.packb(value, default=_msgpack_default, use_bin_type=True)
+        else:
+            fmt = _FORMAT_JSON
+            payload = json.dumps(_json_keys(value), default=_json_default, separators=(",", ":")).encode()
+
+        method, stored = _COMPRESS_NONE, payload
+        if len(payload) >= get_settings().cache_compress_min_bytes:
+            candidate = _compression()
+            if candidate != _COMPRESS_NONE:
+                compressed = _compress(candidate, payload)
+                if len(compressed) < len(payload):
+                    method, stored = candidate, compressed
+                    coder_stats.compressed += 1
+
+        encoded = _HEADER.pack(_MAGIC, CACHE_SCHEMA_VERSION, fmt, method) + stored
+        coder_stats.encodes += 1
+        coder_stats.encode_seconds += time.perf_counter() - started
+        coder_stats.raw_bytes += len(payload)
+        coder_stats.stored_bytes += len(encoded)
+        return encoded
+
+    @classmethod
+    def decode(cls, value: bytes) -> Any:
+        started = time.perf_counter()
+        try:
+            if len(value) < _HEADER.size:
+                raise CacheDecodeError("Cached value is too short")
+            magic, schema, fmt, method = _HEADER.unpack_from(value)
+            if magic != _MAGIC or schema != CACHE_SCHEMA_VERSION:
+                raise CacheDecodeError(f"Cached value has schema {schema}, expected {CACHE_SCHEMA_VERSION}")
+            payload = _decompress(method, bytes(value[_HEADER.size:]))
+            if fmt == _FORMAT_MSGPACK:
+                if msgpack is None:
+                    raise CacheDecodeError("Cached value is msgpack but msgpack is not installed")
+                result = msgpack.unpackb(payload, ext_hook=_msgpack_ext_hook, raw=False, strict_map_key=False)
+            elif fmt == _FORMAT_JSON:
+                result = json.loads(payload, object_hook=_json_object_hook)
+            else:
+                raise CacheDecodeError(f"Unknown cache payload format {fmt!r}")
+        except CacheDecodeError:
+            coder_stats.decode_errors += 1
+            raise
+        coder_stats.decodes += 1
+        coder_stats.decode_seconds += time.perf_counter() - started
+        return result
+
+    @classmethod
+    def decode_as_type(cls, value: bytes, *, type_: Optional[Any]) -> Any:
+        result = cls.decode(value)
+        if isinstance(type_, type) and issubclass(type_, BaseModel) and isinstance(result, dict):
+            return type_.model_validate(result)
+        return result
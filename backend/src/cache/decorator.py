@@ -0,0 +1,163 @@
+from functools import wraps
+from inspect import Parameter, isawaitable, iscoroutinefunction
+from typing import Any, Callable, Dict, List, Optional, Type
+import asyncio
+from fastapi.concurrency import run_in_threadpool
+from fastapi.dependencies.utils import get_typed_return_annotation, get_typed_signature
+from fastapi_cache import FastAPICache
+from fastapi_cache.coder import Coder
+from fastapi_cache.decorator import _augment_signature, _locate_param, _uncacheable
+from fastapi_cache.types import KeyBuilder
+from loguru import logger
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.status import HTTP_304_NOT_MODIFIED
+from src.cache.coder import CacheDecodeError
+from src.cache.local import Expire, expire_seconds
+from src.cache.metrics import cache_metrics
+from src.services.upstream_scheduler import background_priority
+
+_refreshing: Dict[str, asyncio.Task] = {}
+
+def refreshes_in_flight() -> int:
+    return len(_refreshing)
+
+def cache(
+    expire: Expire = None,
+    stale: Expire = None,
+    namespace: str = "",
+    coder: Optional[Type[Coder]] = None,
+    key_builder: Optional[KeyBuilder] = None,
+    injected_dependency_namespace: str = "__fastapi_cache"
+):
+    """Drop-in for ``fastapi_cache.decorator.cache`` with stale-while-revalidate.
+
+    Entries are stored for ``expire + stale`` seconds. For the first ``expire``
+    seconds they are fresh; during the trailing ``stale`` window they are still
+    served immediately, and one background task per key re-runs the function
+    and rewrites the entry. Without ``stale`` this behaves like the upstream
+    decorator.
+    """
+    injected_request = Parameter(
+        name=f"{injected_dependency_namespace}_request",
+        annotation=Request,
+        kind=Parameter.KEYWORD_ONLY
+    )
+    injected_response = Parameter(
+        name=f"{injected_dependency_namespace}_response",
+        annotation=Response,
+        kind=Parameter.KEYWORD_ONLY
+    )
+
+    def wrapper(func: Callable[..., Any]) -> Callable[..., Any]:
+        wrapped_signature = get_typed_signature(func)
+        to_inject: List[Parameter] = []
+        request_param = _locate_param(wrapped_signature, injected_request, to_inject)
+        response_param = _locate_param(wrapped_signature, injected_response, to_inject)
+        return_type = get_typed_return_annotation(func)
+
+        async def call(args, kwargs) -> Any:
+            kwargs = {k: v for k, v in kwargs.items()
+                      if k not in (injected_request.name, injected_response.name)}
+            if iscoroutinefunction(func):
+                return await func(*args, **kwargs)
+            return await run_in_threadpool(func, *args, **kwargs)
+
+        async def store(backend, cache_key: str, value_coder: Type[Coder], result: Any, ttl: int) -> bytes:
+            encoded = value_coder.encode(result)
+            try:
+                await backend.set(cache_key, encoded, ttl)
+            except Exception as e:
+                logger.warning(f"@rayjosong Error setting cache key {cache_key}: {str(e)}")
+            return encoded
+
+        async def refresh(backend, cache_key: str, value_coder: Type[Coder], ttl: int, args, kwargs) -> None:
+            try:
+                with background_priority():
+                    result = await call(args, kwargs)
+                await store(backend, cache_key, value_coder, result, ttl)
+                logger.debug(f"@rayjosong Revalidated stale cache entry {cache_key}")
+            except Exception as e:
+                # The stale copy keeps being served until its hard TTL runs out
+                logger.warning(f"@rayjosong Background refresh failed for {cache_key}: {str(e)}")
+            finally:
+                _refreshing.pop(cache_key, None)
+
+        @wraps(func)
+        async def inner(*args, **kwargs):
+            copy_kwargs = kwargs.copy()
+            request: Optional[Request] = copy_kwargs.pop(request_param.name, None)
+            response: Optional[Response] = copy_kwargs.pop(response_param.name, None)
+
+            if _uncacheable(request):
+                return await call(args, kwargs)
+
+            value_coder = coder or FastAPICache.get_coder()
+            fresh_seconds = int(expire_seconds(expire) or FastAPICache.get_expire() or 0)
+            stale_seconds = int(expire_seconds(stale) or 0)
+            hard_ttl = fresh_seconds + stale_seconds
+            backend = FastAPICache.get_backend()
+            cache_status_header = FastAPICache.get_cache_status_header()
+
+            cache_key = (key_builder or FastAPICache.get_key_builder())(
+                func,
+                f"{FastAPICache.get_prefix()}:{namespace}",
+                request=request,
+                response=response,
+                args=args,
+                kwargs=copy_kwargs
+            )
+            if isawaitable(cache_key):
+                cache_key = await cache_key
+
+            try:
+                ttl, cached = await backend.get_with_ttl(cache_key)
+            except Exception as e:
+                logger.warning(f"@rayjosong Error retrieving cache key {cache_key}: {str(e)}")
+                ttl, cached = 0, None
+
+            decoded = None
+            if cached is not None:
+                try:
+                    decoded = value_coder.decode_as_type(cached, type_=return_type)
+                except CacheDecodeError as e:
+                    logger.warning(f"@rayjosong Ignoring undecodable cache entry {cache_key}: {str(e)}")
+                    cache_metrics.record_key(cache_key, "decode_errors")
+                    cached = None
+
+            if cached is None or (request is not None and request.headers.get("Cache-Control") == "no-cache"):
+                cache_metrics.record_key(cache_key, "misses")
+                result = await call(args, kwargs)
+                encoded = await store(backend, cache_key, value_coder, result, hard_ttl)
+                if response:
+                    response.headers.update({
+                        "Cache-Control": f"max-age={fresh_seconds}",
+                        "ETag": f"W/{hash(encoded)}",
+                        cache_status_header: "MISS"
+                    })
+                return result
+
+            is_stale = stale_seconds > 0 and 0 <= ttl <= stale_seconds
+            cache_metrics.record_key(cache_key, "stale_hits" if is_stale else "hits")
+            if is_stale and cache_key not in _refreshing:
+                _refreshing[cache_key] = asyncio.ensure_future(
+                    refresh(backend, cache_key, value_coder, hard_ttl, args, kwargs)
+                )
+
+            if response:
+                etag = f"W/{hash(cached)}"
+                response.headers.update({
+                    "Cache-Control": f"max-age={max(ttl - stale_seconds, 0)}, stale-while-revalidate={stale_seconds}",
+                    "ETag": etag,
+                    cache_status_header: "STALE" if is_stale else "HIT"
+                })
+                if request and request.headers.get("if-none-match") == etag:
+                    response.status_code = HTTP_304_NOT_MODIFIED
+                    return response
+
+            return decoded
+
+        inner.__signature__ = _augment_signature(wrapped_signature, *to_inject)
+        return inner
+
+    return wrapper
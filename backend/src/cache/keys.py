@@ -0,0 +1,90 @@
+from inspect import signature
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import hashlib
+from pydantic import BaseModel
+from starlette.requests import Request
+from starlette.responses import Response
+
+# Bump when the shape of cached values changes so old entries are never decoded
+CACHE_SCHEMA_VERSION = 1
+
+_SCALARS = (str, int, float, bool, type(None))
+
+def normalize_ticker(ticker: str) -> str:
+    return ticker.strip().upper()
+
+def cache_key(namespace: str, operation: str, provider: str, ticker: Optional[str], **params: Any) -> str:
+    """Readable key: ``{namespace}:v{schema}:{operation}:{provider}:{TICKER}[:k=v,...]``
+
+    The ticker is its own segment so everything cached for one ticker can be
+    found with a single pattern.
+    """
+    parts = [namespace, f"v{CACHE_SCHEMA_VERSION}", operation, provider, normalize_ticker(ticker) if ticker else "-"]
+    if params:
+        parts.append(",".join(f"{name}={params[name]}" for name in sorted(params)))
+    return ":".join(parts)
+
+def input_hash(model: BaseModel) -> str:
+    """Short stable digest of a model's field values"""
+    return hashlib.sha256(model.model_dump_json().encode()).hexdigest()[:16]
+
+def canonical_key_builder(
+    func: Callable[..., Any],
+    namespace: str = "",
+    *,
+    request: Optional[Request] = None,
+    response: Optional[Response] = None,
+    args: Tuple[Any, ...],
+    kwargs: Dict[str, Any]
+) -> str:
+    """fastapi_cache key builder that only uses the semantically relevant inputs.
+
+    Arguments are bound to parameter names, so positional and keyword calls
+    share a key. Injected objects such as ``self`` or a ``financial_provider``
+    dependency contribute their ``provider_name`` rather than their identity,
+    pydantic models contribute a hash of their values, and any other
+    non-scalar argument is ignored.
+    """
+    try:
+        bound = signature(func).bind_partial(*args, **kwargs).arguments
+    except TypeError:
+        bound = dict(kwargs)
+
+    provider = "-"
+    ticker = None
+    params: Dict[str, Any] = {}
+    for name, value in bound.items():
+        if hasattr(value, "provider_name"):
+            provider = value.provider_name
+        elif name == "ticker" and isinstance(value, str):
+            ticker = value
+        elif isinstance(value, _SCALARS):
+            params[name] = value
+        elif isinstance(value, BaseModel):
+            params[name] = input_hash(value)
+    return cache_key(namespace, func.__qualname__, provider, ticker, **params)
+
+def namespace_label(key: str) -> str:
+    """Group a cache key for metrics: its namespace, or the cached operation when it has none"""
+    parts = key.split(":")
+    if len(parts) > 3 and parts[2] == f"v{CACHE_SCHEMA_VERSION}":
+        return parts[1] or parts[3]
+    return parts[1] if len(parts) > 2 else parts[0]
+
+def glob_literal(value: str) -> str:
+    """Escape glob wildcards as one-character classes, which Redis MATCH and fnmatch both read literally"""
+    return "".join(f"[{char}]" if char in "*?[" else char for char in value)
+
+def key_patterns(prefix: str, ticker: Optional[str] = None, namespace: Optional[str] = None) -> List[str]:
+    """Glob patterns for every key cached for a ticker and/or namespace, canonical or bulk.
+
+    A namespace also matches un-namespaced keys whose operation has that name,
+    the same grouping ``namespace_label`` uses for metrics. The ticker and
+    namespace are matched literally, never as wildcards.
+    """
+    if namespace:
+        namespace = glob_literal(namespace)
+    scopes = [f"{prefix}:{namespace}", f"{prefix}::v{CACHE_SCHEMA_VERSION}:{namespace}"] if namespace else [prefix]
+    ticker = glob_literal(normalize_ticker(ticker)) if ticker else None
+    tails = [f"*:{ticker}", f"*:{ticker}:*"] if ticker else ["*"]
+    return [f"{scope}:{tail}" for scope in scopes for tail in tails]
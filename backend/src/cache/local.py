@@ -0,0 +1,93 @@
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+import fnmatch
+import time
+
+Expire = Union[int, float, timedelta, None]
+
+def expire_seconds(expire: Expire) -> Optional[float]:
+    if isinstance(expire, timedelta):
+        return expire.total_seconds()
+    return expire
+
+class LocalTTLCache:
+    """Bounded in-process LRU of bytes values with per-entry TTL and a total byte budget"""
+
+    def __init__(self, max_entries: int, max_bytes: int, on_evict: Optional[Callable[[str], None]] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self.bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries: "OrderedDict[str, Tuple[bytes, float, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def get(self, key: str) -> Optional[Tuple[int, bytes]]:
+        """Return (remaining ttl in seconds, value) for a live entry"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, evict_at, expires_at = entry
+        now = time.monotonic()
+        if evict_at <= now:
+            self.expirations += 1
+            self.delete(key)
+            return None
+        self._entries.move_to_end(key)
+        return int(expires_at - now), value
+
+    def set(self, key: str, value: bytes, ttl: float, max_age: Optional[float] = None) -> None:
+        """Store ``value`` whose remaining TTL is ``ttl``; keep it locally for at most ``max_age``"""
+        keep = ttl if max_age is None else min(ttl, max_age)
+        if keep <= 0 or len(value) > self.max_bytes:
+            self.delete(key)
+            return
+        self.delete(key)
+        now = time.monotonic()
+        self._entries[key] = (value, now + keep, now + ttl)
+        self.bytes += len(value)
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            evicted_key, (evicted, _, _) = self._entries.popitem(last=False)
+            self.bytes -= len(evicted)
+            self.evictions += 1
+            if self.on_evict is not None:
+                self.on_evict(evicted_key)
+
+    def delete(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.bytes -= len(entry[0])
+        return True
+
+    def clear_prefix(self, prefix: str) -> int:
+        keys = [key for key in self._entries if key.startswith(prefix)]
+        for key in keys:
+            self.delete(key)
+        return len(keys)
+
+    def clear_matching(self, patterns: List[str]) -> int:
+        keys = [key for key in self._entries if any(fnmatch.fnmatchcase(key, pattern) for pattern in patterns)]
+        for key in keys:
+            self.delete(key)
+        return len(keys)
+
+    def items(self, patterns: List[str]) -> Iterator[Tuple[str, int, int]]:
+        """(key, remaining ttl, size in bytes) for live entries matching any pattern"""
+        now = time.monotonic()
+        for key, (value, evict_at, expires_at) in list(self._entries.items()):
+            if evict_at > now and any(fnmatch.fnmatchcase(key, pattern) for pattern in patterns):
+                yield key, int(expires_at - now), len(value)
+
+    def clear(self) -> int:
+        count = len(self._entries)
+        self._entries.clear()
+        self.bytes = 0
+        return count
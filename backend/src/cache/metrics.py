@@ -0,0 +1,29 @@
+from collections import defaultdict
+from typing import Any, Dict
+from .keys import namespace_label
+
+class CacheMetrics:
+    """Hit, miss and eviction counters per cache namespace"""
+    EVENTS = ("hits", "stale_hits", "misses", "evictions", "decode_errors")
+
+    def __init__(self):
+        self._counts: Dict[str, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(self.EVENTS, 0))
+
+    def record(self, namespace: str, event: str, count: int = 1) -> None:
+        self._counts[namespace][event] += count
+
+    def record_key(self, key: str, event: str) -> None:
+        self.record(namespace_label(key), event)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        for namespace, counts in sorted(self._counts.items()):
+            lookups = counts["hits"] + counts["stale_hits"] + counts["misses"]
+            hit_ratio = (counts["hits"] + counts["stale_hits"]) / lookups if lookups else 0.0
+            result[namespace] = {**counts, "hit_ratio": round(hit_ratio, 4)}
+        return result
+
+    def reset(self) -> None:
+        self._counts.clear()
+
+cache_metrics = CacheMetrics()
@@ -1,13 +1,98 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 class Settings(BaseSettings):
     alpha_vantage_api_key: str = "demo"
     log_level: str = "DEBUG"
 
+    # Upstream endpoints; point these at the stand-in server for offline benchmarks
+    alpha_vantage_base_url: str = "https://www.alphavantage.co/query"
+    ollama_base_url: str = "http://localhost:11434"
+    yahoo_standin_url: Optional[str] = None
+
+    # Cache: in-process L1 in front of Redis
+    redis_url: str = "redis://localhost"
+    cache_l1_max_entries: int = 10000
+    cache_l1_max_bytes: int = 64 * 1024 * 1024
+    cache_l1_ttl_seconds: float = 60.0
+    cache_invalidation_channel: str = "fastapi-cache:invalidate"
+    redis_socket_timeout_seconds: float = 0.5
+    cache_compression: str = "auto"  # auto, zstd, lz4, zlib or none
+    cache_compress_min_bytes: int = 1024
+    redis_health_interval_seconds: float = 2.0
+
+    # Shared upstream HTTP client
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry_seconds: float = 30.0
+    http_timeout_seconds: float = 10.0
+    http_connect_timeout_seconds: float = 5.0
+
+    # Thread pool for blocking yfinance calls
+    yfinance_max_workers: int = 8
+    yfinance_max_queue: int = 64
+    yfinance_timeout_seconds: float = 20.0
+    yahoo_snapshot_ttl_seconds: float = 300.0
+    yahoo_snapshot_max_tickers: int = 1000
+
+    # Upstream quotas (requests_per_day of 0 means no daily cap)
+    alpha_vantage_requests_per_minute: float = 5
+    alpha_vantage_burst: int = 5
+    alpha_vantage_requests_per_day: int = 25
+    yahoo_requests_per_minute: float = 120
+    yahoo_burst: int = 10
+    yahoo_requests_per_day: int = 0
+    scheduler_max_wait_seconds: float = 30.0
+
+    # Multi-ticker quotes
+    batch_max_tickers: int = 500
+    batch_cache_seconds: int = 300
+    batch_download_chunk: int = 100
+    metadata_cache_hours: int = 24
+
+    # Provider routing and hedging (providers: yahoo_finance, alpha_vantage, mock)
+    financial_providers: str = "yahoo_finance,alpha_vantage"
+    router_window: int = 200
+    hedging_enabled: bool = True
+    hedge_percentile: float = 0.95
+    hedge_min_delay_ms: float = 50
+    hedge_default_delay_ms: float = 1500
+    hedge_min_samples: int = 20
+
+    # Per-provider circuit breakers
+    circuit_failure_threshold: int = 5
+    circuit_recovery_seconds: float = 30.0
+    circuit_half_open_probes: int = 2
+    stale_fallback_max_entries: int = 1000
+
+    # Local fundamentals store
+    fundamentals_db_path: str = "data/fundamentals.db"
+    fundamentals_filing_lag_days: int = 30  # earliest a new annual filing is expected after year end
+    fundamentals_recheck_hours: float = 24.0
+
+    # Local daily price history store
+    price_store_path: str = "data/prices"
+    price_store_max_open: int = 256
+    price_store_refresh_minutes: float = 15.0
+
+    # Monte Carlo DCF: simulations run on their own bounded thread pool
+    monte_carlo_max_paths: int = 1000000
+    monte_carlo_max_tickers: int = 50
+    monte_carlo_max_workers: int = 2
+    monte_carlo_timeout_seconds: float = 60.0
+
+    # Cache warming: watchlist plus the most requested tickers
+    cache_warm_enabled: bool = True
+    cache_warm_watchlist: str = ""
+    cache_warm_top_n: int = 20
+    cache_warm_targets: str = "stock_info,financial_metrics,moat_analysis"
+    cache_warm_interval_seconds: float = 900.0
+    cache_warm_pause_seconds: float = 1.0
+
     class Config:
         env_file = ".env"
 
 @lru_cache()
 def get_settings() -> Settings:
-    return Settings() 
\ No newline at end of file
+    return Settings()
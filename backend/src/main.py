@@ -1,13 +1,22 @@
 from fastapi import FastAPI
 from loguru import logger
 import uvicorn
-from src.api.routes import router as api_router
+from src.api.routes import router as api_router, get_warm_targets
+from src.api.dependencies import get_financial_provider
 from src.api.error_handlers import setup_error_handlers
 from fastapi_cache import FastAPICache
-from fastapi_cache.backends.redis import RedisBackend
-from fastapi_cache.decorator import cache
+from src.cache.backends import TwoTierBackend
+from src.cache.local import LocalTTLCache
+from src.cache.keys import canonical_key_builder
+from src.cache.coder import BinaryCoder
+from src.cache.metrics import cache_metrics
+from src.config import get_settings
 from redis import asyncio as aioredis
 from fastapi.middleware.cors import CORSMiddleware
+from src.services.http_client import get_http_client, close_http_client
+from src.services.blocking_executor import get_yfinance_executor
+from src.services.dcf_simulation import get_simulation_executor
+from src.services.cache_warmer import CacheWarmer, get_ticker_popularity
 
 def create_app() -> FastAPI:
     app = FastAPI(
@@ -33,16 +42,59 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+
+    @app.middleware("http")
+    async def track_ticker_popularity(request, call_next):
+        get_ticker_popularity().record_path(request.url.path)
+        return await call_next(request)
     
     @app.on_event("startup")
     async def startup():
-        redis = aioredis.from_url("redis://localhost")
-        FastAPICache.init(RedisBackend(redis), prefix="fastapi-cache")
+        settings = get_settings()
+        # Short socket timeouts so a down or slow Redis degrades the cache
+        # to memory quickly instead of stalling every cached request
+        redis = aioredis.from_url(
+            settings.redis_url,
+            socket_timeout=settings.redis_socket_timeout_seconds,
+            socket_connect_timeout=settings.redis_socket_timeout_seconds
+        )
+        backend = TwoTierBackend(
+            redis,
+            LocalTTLCache(settings.cache_l1_max_entries, settings.cache_l1_max_bytes,
+                          on_evict=lambda key: cache_metrics.record_key(key, "evictions")),
+            l1_ttl=settings.cache_l1_ttl_seconds,
+            channel=settings.cache_invalidation_channel,
+            health_interval=settings.redis_health_interval_seconds,
+            health_timeout=settings.redis_socket_timeout_seconds
+        )
+        FastAPICache.init(backend, prefix="fastapi-cache", coder=BinaryCoder,
+                          key_builder=canonical_key_builder)
+        await backend.start()
+        get_http_client()
+
+        app.state.cache_warmer = None
+        if settings.cache_warm_enabled:
+            targets = get_warm_targets(get_financial_provider())
+            enabled = [name.strip() for name in settings.cache_warm_targets.split(",") if name.strip()]
+            app.state.cache_warmer = CacheWarmer(
+                {name: targets[name] for name in enabled if name in targets},
+                watchlist=settings.cache_warm_watchlist.split(","),
+                top_n=settings.cache_warm_top_n,
+                interval=settings.cache_warm_interval_seconds,
+                pause=settings.cache_warm_pause_seconds
+            )
+            app.state.cache_warmer.start()
     
     @app.on_event("shutdown")
     async def shutdown():
-        # Clean up resources here
-        pass
+        if app.state.cache_warmer is not None:
+            await app.state.cache_warmer.stop()
+        backend = FastAPICache.get_backend()
+        if isinstance(backend, TwoTierBackend):
+            await backend.stop()
+        await close_http_client()
+        get_yfinance_executor().shutdown()
+        get_simulation_executor().shutdown()
     
     return app
 
@@ -25,11 +25,21 @@ class StockAPIError(HTTPException):
 
 class StockNotFoundError(HTTPException):
     def __init__(self, ticker: str):
+        self.ticker = ticker
+        self.message = f"Stock with ticker {ticker} not found"
         super().__init__(
             status_code=404,
-            detail=f"Stock with ticker {ticker} not found"
+            detail=self.message
         )
 
+class CircuitOpenError(StockAPIError):
+    """Exception raised when a provider's circuit breaker is open"""
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.message = f"{provider} is temporarily unavailable"
+        super().__init__(self.message)
+        self.status_code = 503
+
 class CustomHTTPException(HTTPException):
     def __init__(self, status_code: int, data: Dict[str, Any]):
         self.status_code = status_code
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, ConfigDict
-from typing import List, Dict, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, List, Dict, Literal, Optional
+from src.models.validators import RateDistribution
 
 class StockInfo(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -10,6 +11,7 @@ class StockInfo(BaseModel):
     currency: str
     sector: str
     industry: str
+    market_cap: Optional[float] = None
 
 class DCFAssumption(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -25,13 +27,131 @@ class DCFCalculation(BaseModel):
     fcf: float
     present_value: float
 
+class DCFValuation(BaseModel):
+    # The price-independent part of an IntrinsicValue
+    model_config = ConfigDict(from_attributes=True)
+
+    intrinsic_value: float
+    methodology: str
+    assumptions: Dict[str, DCFAssumption]
+    calculation: Dict[str, List[DCFCalculation]]
+    inputs_hash: str
+
 class IntrinsicValue(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     
     intrinsic_value: float
     current_price: float
-    upside: float
+    market_cap: Optional[float] = None
+    # Against market cap; None (valuation "Unknown") when market cap is unavailable
+    upside: Optional[float] = None
     valuation: str
     methodology: str
     assumptions: Dict[str, DCFAssumption]
-    calculation: Dict[str, List[DCFCalculation]] 
\ No newline at end of file
+    calculation: Dict[str, List[DCFCalculation]] 
+
+class BatchStockResult(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
+    ticker: str
+    data: Optional[StockInfo] = None
+    error: Optional[str] = None
+
+class BatchStockRequest(BaseModel):
+    tickers: List[str]
+
+class PriceHistory(BaseModel):
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
+    ticker: str
+    period: str
+    interval: str
+    dates: List[str]
+    prices: List[float]
+    current_price: float = Field(alias="currentPrice")
+    percent_change: float = Field(alias="percentChange")
+    source_points: int = Field(alias="sourcePoints")
+
+class SensitivityGrid(BaseModel):
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
+    ticker: str
+    current_price: float = Field(alias="currentPrice")
+    market_cap: Optional[float] = Field(None, alias="marketCap")
+    base_fcf: float = Field(alias="baseFcf")
+    projection_years: int = Field(alias="projectionYears")
+    dimensions: List[str]
+    growth_rates: List[float] = Field(alias="growthRates")
+    discount_rates: List[float] = Field(alias="discountRates")
+    terminal_rates: List[float] = Field(alias="terminalRates")
+    # Nested along ``dimensions``; cells outside the DCFInputs rules are null
+    intrinsic_values: List[Any] = Field(alias="intrinsicValues")
+    upside: List[Any]
+
+class MonteCarloRequest(BaseModel):
+    tickers: List[str] = Field(min_length=1)
+    paths: int = Field(100000, ge=1000)
+    seed: Optional[int] = Field(None, ge=0)
+    projection_years: int = Field(5, ge=3, le=10)
+    histogram_bins: int = Field(50, ge=5, le=500)
+    growth_rate: RateDistribution = RateDistribution(kind="normal", mean=0.08, std=0.03)
+    discount_rate: RateDistribution = RateDistribution(kind="normal", mean=0.10, std=0.015)
+    terminal_rate: RateDistribution = RateDistribution(kind="normal", mean=0.02, std=0.005)
+
+class ValueHistogram(BaseModel):
+    # Values beyond the 1st/99th percentiles are counted in the outer bins
+    edges: List[float]
+    counts: List[int]
+
+class MonteCarloValuation(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    ticker: str
+    current_price: float
+    market_cap: Optional[float] = None
+    base_fcf: float
+    seed: int
+    paths: int
+    valid_paths: int
+    mean: float
+    std: float
+    # Whole-company values; undervalued means above market cap (None when market cap is unknown)
+    percentiles: Dict[str, float]
+    probability_undervalued: Optional[float] = None
+    histogram: ValueHistogram
+
+class MonteCarloResult(BaseModel):
+    ticker: str
+    data: Optional[MonteCarloValuation] = None
+    error: Optional[str] = None
+
+class ReverseDCFRequest(BaseModel):
+    tickers: List[str] = Field(min_length=1)
+    solve_for: Literal["growth_rate", "discount_rate"] = "growth_rate"
+    # Held fixed unless solved for
+    growth_rate: float = 0.08
+    discount_rate: float = 0.10
+    terminal_rate: float = 0.02
+    projection_years: int = Field(5, ge=3, le=10)
+    # Total equity value to solve against per ticker, in the same currency as FCF (the DCF
+    # values the whole company, not one share); defaults to the provider's market cap
+    targets: Dict[str, float] = {}
+
+class ImpliedRate(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    ticker: str
+    solve_for: str
+    implied_rate: Optional[float] = None
+    target_value: float
+    base_fcf: float
+    status: str
+    converged: bool
+    iterations: int
+    residual: Optional[float] = None
+    bounds: List[float]
+
+class ImpliedRateResult(BaseModel):
+    ticker: str
+    data: Optional[ImpliedRate] = None
+    error: Optional[str] = None
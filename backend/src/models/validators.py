@@ -1,5 +1,11 @@
-from pydantic import BaseModel, Field, model_validator
-from typing import Optional
+from pydantic import AfterValidator, BaseModel, Field, StringConstraints, model_validator
+from typing import Annotated, Literal, Optional, Tuple
+import numpy as np
+from src.cache.keys import normalize_ticker
+
+# Ticker parameter normalized on the way in, so cache keys and cached payloads agree.
+# Symbols never contain glob characters, so a ticker can go straight into a SCAN MATCH pattern
+Ticker = Annotated[str, StringConstraints(pattern=r"^\s*[A-Za-z0-9.^=\-]{1,20}\s*$"), AfterValidator(normalize_ticker)]
 
 class DCFInputs(BaseModel):
     growth_rate: float = Field(ge=0, le=0.5)
@@ -12,4 +18,39 @@ class DCFInputs(BaseModel):
     def validate_rates(self):
         if self.terminal_rate >= self.growth_rate:
             raise ValueError('Terminal growth rate must be less than growth rate')
-        return self 
\ No newline at end of file
+        return self
+
+class RateDistribution(BaseModel):
+    """Sampling distribution for one DCF rate; ``mean`` is also the mode of a triangular distribution"""
+    kind: Literal["fixed", "normal", "uniform", "triangular"] = "normal"
+    mean: float
+    std: float = Field(0.0, ge=0)
+    low: Optional[float] = None
+    high: Optional[float] = None
+
+    @model_validator(mode='after')
+    def validate_range(self):
+        if self.kind in ("uniform", "triangular"):
+            if self.low is None or self.high is None or self.low > self.high:
+                raise ValueError(f'{self.kind} distribution needs low <= high')
+            if self.kind == "triangular" and not self.low <= self.mean <= self.high:
+                raise ValueError('Triangular mode (mean) must lie between low and high')
+        return self
+
+def input_bounds(field: str) -> Tuple[float, float]:
+    """Inclusive (min, max) DCFInputs accepts for a rate field"""
+    low, high = -np.inf, np.inf
+    for constraint in DCFInputs.model_fields[field].metadata:
+        low = getattr(constraint, "ge", low)
+        high = getattr(constraint, "le", high)
+    return low, high
+
+def valid_rates(growth_rate, discount_rate, terminal_rate) -> np.ndarray:
+    """Element-wise DCFInputs rate rules for broadcastable arrays of assumptions"""
+    valid = np.asarray(True)
+    for field, values in (("growth_rate", growth_rate), ("discount_rate", discount_rate),
+                          ("terminal_rate", terminal_rate)):
+        low, high = input_bounds(field)
+        values = np.asarray(values)
+        valid = valid & (values >= low) & (values <= high)
+    return valid & (np.asarray(terminal_rate) < np.asarray(growth_rate))
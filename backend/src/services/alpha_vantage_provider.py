@@ -1,112 +1,208 @@
-from typing import Dict
-import requests
+from typing import Dict, Optional
 import json
 from loguru import logger
+from src.config import get_settings
 from src.models.stock import StockInfo
-from src.models.errors import StockNotFoundError, StockAPIError
+from src.models.errors import StockNotFoundError, StockAPIError, RateLimitError
 from .financial_data_provider import FinancialDataProvider
-from fastapi_cache.decorator import cache
+from .http_client import get_http_client
+from .fetch_planner import FetchPlanner
+from .single_flight import coalesce
+from .upstream_scheduler import get_upstream_scheduler
+from .fundamentals_store import fiscal_date, get_fundamentals_store, valid_fiscal_date
+from src.cache.decorator import cache
 from datetime import timedelta
 import fastapi_cache
 
 class AlphaVantageProvider(FinancialDataProvider):
+    ENDPOINTS = {
+        "stock_info": ("OVERVIEW", "GLOBAL_QUOTE"),
+        "financial_metrics": ("CASH_FLOW",)
+    }
+
     def __init__(self, api_key: str):
+        self.provider_name = "Alpha Vantage"
         self.api_key = api_key
-        self.base_url = "https://www.alphavantage.co/query"
+        settings = get_settings()
+        self.base_url = settings.alpha_vantage_base_url
+        self.timeout = settings.http_timeout_seconds
+        self.planner = FetchPlanner(self.ENDPOINTS)
+        self.fundamentals = get_fundamentals_store()
         logger.info("@rayjosong Initialized AlphaVantageProvider")
 
-    async def get_current_price(self, ticker: str) -> float:
-        """Get the current price for a ticker using Alpha Vantage's GLOBAL_QUOTE endpoint"""
-        logger.debug(f"@rayjosong Fetching current price for {ticker}")
+    async def _query(self, function: str, ticker: str) -> Dict:
+        """Call an Alpha Vantage function on the shared async client"""
         params = {
-            "function": "GLOBAL_QUOTE",
+            "function": function,
             "symbol": ticker,
             "apikey": self.api_key
         }
-        
+        scheduler = get_upstream_scheduler()
+        await scheduler.acquire(self.provider_name)
+        response = await get_http_client().get(self.base_url, params=params, timeout=self.timeout)
+        if response.status_code == 429:
+            scheduler.report_rejection(self.provider_name)
+            raise RateLimitError(self.provider_name)
+        response.raise_for_status()
+        data = response.json()
+
+        # Alpha Vantage reports quota rejections as a 200 with a Note/Information message
+        if "Note" in data or "Information" in data:
+            logger.error(f"@rayjosong Alpha Vantage rejected {function} for {ticker}: " +
+                         f"{data.get('Note') or data.get('Information')}")
+            scheduler.report_rejection(self.provider_name)
+            raise RateLimitError(self.provider_name)
+        return data
+
+    @cache(expire=timedelta(minutes=1))
+    @coalesce("current_price")
+    async def get_current_price(self, ticker: str) -> float:
+        """Get the current price for a ticker using Alpha Vantage's GLOBAL_QUOTE endpoint"""
+        logger.debug(f"@rayjosong Fetching current price for {ticker}")
         try:
-            response = requests.get(self.base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            if "Global Quote" not in data or not data["Global Quote"]:
-                logger.error(f"@rayjosong No price data found for ticker {ticker}")
-                return 0.0
-                
-            price = float(data["Global Quote"].get("05. price", 0)) 
-            logger.info(f"@rayjosong Current price for {ticker}: {price}")
-            return price
-            
+            data = await self._query("GLOBAL_QUOTE", ticker)
+        except RateLimitError:
+            raise
         except Exception as e:
-            logger.error(f"@rayjosong Error fetching current price for {ticker}: {str(e)}")
+            data = e
+        if isinstance(data, dict) and not data.get("Global Quote"):
+            raise StockNotFoundError(ticker)
+        price = self._parse_price(ticker, data)
+        # Raise rather than cache a missing quote, so the router can fail over
+        if price <= 0:
+            raise StockAPIError(f"No current price available for {ticker}")
+        return price
+
+    def _parse_price(self, ticker: str, data) -> float:
+        if isinstance(data, Exception):
+            logger.error(f"@rayjosong Error fetching current price for {ticker}: {str(data)}")
             return 0.0
 
-    def _generate_cache_key(self, ticker: str, operation: str) -> str:
-        return f"fastapi_cache:{self.__class__.__name__}.{operation}:{ticker.upper()}"
+        if "Global Quote" not in data or not data["Global Quote"]:
+            logger.error(f"@rayjosong No price data found for ticker {ticker}")
+            return 0.0
+
+        try:
+            price = float(data["Global Quote"].get("05. price", 0))
+        except (TypeError, ValueError) as e:
+            logger.error(f"@rayjosong Error parsing current price for {ticker}: {str(e)}")
+            return 0.0
+        logger.info(f"@rayjosong Current price for {ticker}: {price}")
+        return price
+
+    def _build_stock_info(self, ticker: str, results: Dict) -> StockInfo:
+        overview = results["OVERVIEW"]
+        if isinstance(overview, Exception):
+            raise overview
+
+        if "Name" not in overview:
+            logger.error(f"@rayjosong No data found for ticker {ticker}")
+            raise StockNotFoundError(ticker)
+
+        return StockInfo(
+            ticker=ticker,
+            name=overview["Name"],
+            current_price=self._parse_price(ticker, results["GLOBAL_QUOTE"]),
+            currency="USD",
+            sector=overview.get("Sector", "Unknown"),
+            industry=overview.get("Industry", "Unknown"),
+            market_cap=self._parse_market_cap(overview.get("MarketCapitalization"))
+        )
+
+    @staticmethod
+    def _parse_market_cap(value) -> Optional[float]:
+        try:
+            market_cap = float(value)
+        except (TypeError, ValueError):
+            # Missing, or reported as "None"
+            return None
+        return market_cap if market_cap > 0 else None
+
+    def _build_financial_metrics(self, ticker: str, results: Dict) -> Dict:
+        data = results["CASH_FLOW"]
+        if isinstance(data, Exception):
+            raise data
+
+        if "annualReports" not in data:
+            logger.error(f"@rayjosong No cash flow data found for ticker {ticker}")
+            raise StockNotFoundError(ticker)
+
+        periods = []
+        for report in data["annualReports"]:
+            if not valid_fiscal_date(fiscal_date(report.get("fiscalDateEnding"))):
+                continue
+            try:
+                operating_cash_flow = float(report.get("operatingCashflow", 0))
+                capex = float(report.get("capitalExpenditures", 0))
+            except (TypeError, ValueError):
+                # Older periods sometimes report "None"
+                continue
+            periods.append({
+                "fiscal_date": fiscal_date(report["fiscalDateEnding"]),
+                "operating_cash_flow": operating_cash_flow,
+                "capital_expenditure": capex,
+                "fcf": operating_cash_flow - capex
+            })
+        if not periods:
+            logger.error(f"@rayjosong No usable cash flow reports for ticker {ticker}")
+            raise StockNotFoundError(ticker)
+
+        self.fundamentals.save(self.provider_name, ticker, periods)
+        return self._metrics_from_period(max(periods, key=lambda period: period["fiscal_date"]))
+
+    @staticmethod
+    def _metrics_from_period(period: Dict) -> Dict:
+        return {
+            "fcf": period["fcf"],
+            "year": period["fiscal_date"]
+        }
+
+    def _stored_metrics(self, ticker: str, fallback: bool = False) -> Optional[Dict]:
+        """Metrics from the local store when it is current (or, as a fallback, whenever it has any)"""
+        latest = self.fundamentals.stored(self.provider_name, ticker, fallback=fallback)
+        return self._metrics_from_period(latest) if latest is not None else None
+
+    def _metrics_after_failure(self, ticker: str, error: Exception) -> Dict:
+        """Fall back to the last stored period when refreshing cash flow fails"""
+        stored = self._stored_metrics(ticker, fallback=True)
+        if stored is not None:
+            logger.warning(f"@rayjosong Serving stored cash flow for {ticker} after refresh failed: {str(error)}")
+            return stored
+        if isinstance(error, RateLimitError):
+            raise error
+        logger.error(f"@rayjosong Error fetching financial metrics for {ticker}: {str(error)}")
+        raise StockAPIError(f"Failed to fetch financial metrics: {str(error)}")
+
+    async def _execute_plan(self, ticker: str, *operations: str) -> Dict:
+        return await self.planner.execute(operations, lambda function: self._query(function, ticker))
 
     @cache(expire=timedelta(hours=1))
+    @coalesce("stock_info")
     async def get_stock_info(self, ticker: str) -> StockInfo:
         logger.info(f"@rayjosong Calling Alpha Vantage API for {ticker} stock info")
-        params = {
-            "function": "OVERVIEW",
-            "symbol": ticker,
-            "apikey": self.api_key
-        }
-        
         try:
-            response = requests.get(self.base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            if "Name" not in data:
-                logger.error(f"@rayjosong No data found for ticker {ticker}")
-                raise StockNotFoundError(ticker)
-            
-            current_price = await self.get_current_price(ticker)
-            
-            return StockInfo(
-                ticker=ticker,
-                name=data["Name"],
-                current_price=current_price,
-                currency="USD",
-                sector=data.get("Sector", "Unknown"),
-                industry=data.get("Industry", "Unknown")
-            )
-            
+            results = await self._execute_plan(ticker, "stock_info")
+            return self._build_stock_info(ticker, results)
+
+        except (RateLimitError, StockNotFoundError):
+            raise
         except Exception as e:
             logger.error(f"@rayjosong Error fetching stock info for {ticker}: {str(e)}")
             raise StockAPIError(f"Failed to fetch stock data: {str(e)}")
 
     @cache(expire=timedelta(hours=1))
+    @coalesce("financial_metrics")
     async def get_financial_metrics(self, ticker: str) -> Dict:
-        cache_key = self._generate_cache_key(ticker, "financial_metrics")
+        stored = self._stored_metrics(ticker)
+        if stored is not None:
+            return stored
+
         logger.info(f"@rayjosong Calling Alpha Vantage API for {ticker} financial metrics")
-        logger.debug(f"@rayjosong Fetching financial metrics for {ticker}")
-        params = {
-            "function": "CASH_FLOW",
-            "symbol": ticker,
-            "apikey": self.api_key
-        }
-        
         try:
-            response = requests.get(self.base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            if "annualReports" not in data:
-                logger.error(f"@rayjosong No cash flow data found for ticker {ticker}")
-                raise StockNotFoundError(ticker)
-                
-            latest_report = data["annualReports"][0]
-            operating_cash_flow = float(latest_report.get("operatingCashflow", 0))
-            capex = float(latest_report.get("capitalExpenditures", 0))
-            fcf = operating_cash_flow - capex
-            
-            return {
-                "fcf": fcf,
-                "year": latest_report.get("fiscalDateEnding", "Unknown")
-            }
-            
+            results = await self._execute_plan(ticker, "financial_metrics")
+            return self._build_financial_metrics(ticker, results)
+
+        except StockNotFoundError:
+            raise
         except Exception as e:
-            logger.error(f"@rayjosong Error fetching financial metrics for {ticker}: {str(e)}")
-            raise StockAPIError(f"Failed to fetch financial metrics: {str(e)}") 
\ No newline at end of file
+            return self._metrics_after_failure(ticker, e)
@@ -0,0 +1,64 @@
+from typing import Dict, List
+from loguru import logger
+from src.config import get_settings
+from src.models.stock import StockInfo, BatchStockResult
+from .financial_data_provider import FinancialDataProvider
+from .bulk_cache import bulk_key, get_many, set_many
+
+class BatchQuoteService:
+    """Resolve many tickers with one bulk cache read and one bulk upstream fetch.
+
+    Entries share the canonical key of the cached ``/stock/{ticker}`` route, so
+    a ticker fetched by either path is served from cache by the other.
+    """
+    CACHE_OPERATION = "get_stock_info"
+
+    def __init__(self, provider: FinancialDataProvider):
+        settings = get_settings()
+        self.provider = provider
+        self.max_tickers = settings.batch_max_tickers
+        self.expire = settings.batch_cache_seconds
+
+    @staticmethod
+    def normalize(tickers: List[str]) -> List[str]:
+        seen = []
+        for ticker in tickers:
+            ticker = ticker.strip().upper()
+            if ticker and ticker not in seen:
+                seen.append(ticker)
+        return seen
+
+    @staticmethod
+    def _describe(error: Exception) -> str:
+        return str(getattr(error, "detail", None) or error)
+
+    async def get_stock_infos(self, tickers: List[str]) -> List[BatchStockResult]:
+        tickers = self.normalize(tickers)
+        if len(tickers) > self.max_tickers:
+            raise ValueError(f"At most {self.max_tickers} tickers can be requested at once")
+
+        keys = {ticker: bulk_key("", self.CACHE_OPERATION, self.provider.provider_name, ticker) for ticker in tickers}
+        cached = await get_many(list(keys.values()), StockInfo)
+        results: Dict[str, BatchStockResult] = {}
+        for ticker, key in keys.items():
+            if key in cached:
+                results[ticker] = BatchStockResult(ticker=ticker, data=cached[key])
+
+        misses = [ticker for ticker in tickers if ticker not in results]
+        logger.info(f"@rayjosong Batch quote for {len(tickers)} tickers: " +
+                    f"{len(tickers) - len(misses)} cached, {len(misses)} to fetch")
+
+        if misses:
+            fetched = await self.provider.get_stock_infos(misses)
+            to_cache = {}
+            for ticker in misses:
+                outcome = fetched.get(ticker)
+                if isinstance(outcome, StockInfo):
+                    results[ticker] = BatchStockResult(ticker=ticker, data=outcome)
+                    to_cache[keys[ticker]] = outcome
+                else:
+                    error = self._describe(outcome) if outcome is not None else "No data returned"
+                    results[ticker] = BatchStockResult(ticker=ticker, error=error)
+            await set_many(to_cache, self.expire)
+
+        return [results[ticker] for ticker in tickers]
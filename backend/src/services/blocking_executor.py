@@ -0,0 +1,133 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import functools
+import threading
+import time
+from loguru import logger
+from src.config import get_settings
+
+class BlockingExecutor:
+    """Bounded thread pool for blocking upstream libraries.
+
+    At most ``max_workers`` calls run at once and at most ``max_queue`` more
+    wait for a thread. Callers beyond that wait for admission (backpressure)
+    instead of piling unbounded work onto the pool. Every call is bounded by
+    a timeout covering admission, queueing and execution.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int, timeout: float):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+        self._waiting_admission = 0
+        self._queued = 0
+        self._running = 0
+        self._started = 0
+        self._completed = 0
+        self._failed = 0
+        self._timed_out = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        logger.info(f"@rayjosong Initialized {name} executor: workers={max_workers}, queue={max_queue}, timeout={timeout}s")
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers + self.max_queue)
+        return self._slots
+
+    async def run(self, func: Callable[..., Any], *args, operation: str = "call",
+                  timeout: Optional[float] = None, **kwargs) -> Any:
+        """Run a blocking callable on the pool and await its result"""
+        timeout = self.timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        slots = self._get_slots()
+        enqueued_at = time.perf_counter()
+
+        self._waiting_admission += 1
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self._timed_out += 1
+            raise TimeoutError(f"{self.name} {operation} was not admitted within {timeout}s " +
+                               f"({self._queued} queued, {self._running} running)")
+        finally:
+            self._waiting_admission -= 1
+
+        with self._lock:
+            self._queued += 1
+
+        def task():
+            wait = time.perf_counter() - enqueued_at
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._started += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+        def release(future):
+            if future.cancelled():
+                # Cancelled before a thread picked it up, so task() never ran
+                with self._lock:
+                    self._queued -= 1
+            loop.call_soon_threadsafe(slots.release)
+
+        future = self._pool.submit(task)
+        future.add_done_callback(release)
+
+        remaining = max(timeout - (time.perf_counter() - enqueued_at), 0)
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), remaining)
+        except asyncio.TimeoutError:
+            # A call that already started keeps its thread until it returns,
+            # and keeps its slot so the pool stays bounded
+            future.cancel()
+            self._timed_out += 1
+            logger.warning(f"@rayjosong {self.name} {operation} timed out after {timeout}s")
+            raise TimeoutError(f"{self.name} {operation} timed out after {timeout}s")
+        except Exception:
+            self._failed += 1
+            raise
+
+        self._completed += 1
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "timeout_seconds": self.timeout,
+                "running": self._running,
+                "queue_depth": self._queued,
+                "waiting_admission": self._waiting_admission,
+                "completed": self._completed,
+                "failed": self._failed,
+                "timed_out": self._timed_out,
+                "avg_wait_ms": round(self._total_wait / self._started * 1000, 2) if self._started else 0.0,
+                "max_wait_ms": round(self._max_wait * 1000, 2)
+            }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        logger.info(f"@rayjosong Shut down {self.name} executor")
+
+@functools.lru_cache()
+def get_yfinance_executor() -> BlockingExecutor:
+    settings = get_settings()
+    return BlockingExecutor(
+        "yfinance",
+        max_workers=settings.yfinance_max_workers,
+        max_queue=settings.yfinance_max_queue,
+        timeout=settings.yfinance_timeout_seconds
+    )
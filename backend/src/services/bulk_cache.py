@@ -0,0 +1,60 @@
+from typing import Any, Dict, List, Optional
+import asyncio
+from loguru import logger
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+from src.cache.coder import CacheDecodeError
+from src.cache.keys import cache_key
+from src.cache.metrics import cache_metrics
+
+def bulk_key(namespace: str, operation: str, provider: str, ticker: str) -> str:
+    """Canonical key, so bulk entries share layout (and entries) with decorator-cached calls"""
+    return cache_key(f"{FastAPICache.get_prefix()}:{namespace}", operation, provider, ticker)
+
+async def get_many(keys: List[str], type_: Optional[Any] = None) -> Dict[str, Any]:
+    """Fetch and decode several cache keys in one round trip where the backend allows it"""
+    if not keys:
+        return {}
+    try:
+        backend = FastAPICache.get_backend()
+        if hasattr(backend, "get_many"):
+            values = await backend.get_many(keys)
+        elif isinstance(backend, RedisBackend):
+            values = await backend.redis.mget(keys)
+        else:
+            values = await asyncio.gather(*(backend.get(key) for key in keys))
+    except Exception as e:
+        logger.warning(f"@rayjosong Bulk cache read failed, treating {len(keys)} keys as misses: {str(e)}")
+        values = [None] * len(keys)
+    coder = FastAPICache.get_coder()
+    decoded: Dict[str, Any] = {}
+    for key, value in zip(keys, values):
+        if value is not None:
+            try:
+                decoded[key] = coder.decode_as_type(value, type_=type_)
+            except CacheDecodeError as e:
+                logger.warning(f"@rayjosong Ignoring undecodable cache entry {key}: {str(e)}")
+                cache_metrics.record_key(key, "decode_errors")
+                value = None
+        cache_metrics.record_key(key, "misses" if value is None else "hits")
+    return decoded
+
+async def set_many(values: Dict[str, Any], expire: Optional[int] = None) -> None:
+    """Encode and store several cache entries in one round trip where the backend allows it"""
+    if not values:
+        return
+    try:
+        coder = FastAPICache.get_coder()
+        items = {key: coder.encode(value) for key, value in values.items()}
+        backend = FastAPICache.get_backend()
+        if hasattr(backend, "set_many"):
+            await backend.set_many(items, expire)
+        elif isinstance(backend, RedisBackend):
+            async with backend.redis.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.set(key, value, ex=expire)
+                await pipe.execute()
+        else:
+            await asyncio.gather(*(backend.set(key, value, expire) for key, value in items.items()))
+    except Exception as e:
+        logger.warning(f"@rayjosong Bulk cache write failed for {len(values)} keys: {str(e)}")
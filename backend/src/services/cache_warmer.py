@@ -0,0 +1,145 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import functools
+import re
+import time
+from loguru import logger
+from src.models.errors import RateLimitError
+from .upstream_scheduler import background_priority
+
+class TickerPopularity:
+    """Decayed request counts per ticker, learned from the request log"""
+    TICKER_PATH = re.compile(r"^/api/v1/(?:stock|financials|moat-analysis)/([A-Za-z0-9.\-^=]+)")
+
+    def __init__(self, max_tracked: int = 5000):
+        self.max_tracked = max_tracked
+        self._counts: Dict[str, float] = {}
+
+    def record(self, ticker: str) -> None:
+        ticker = ticker.strip().upper()
+        self._counts[ticker] = self._counts.get(ticker, 0.0) + 1.0
+        if len(self._counts) > self.max_tracked:
+            coldest = min(self._counts, key=self._counts.get)
+            del self._counts[coldest]
+
+    def record_path(self, path: str) -> None:
+        match = self.TICKER_PATH.match(path)
+        if match:
+            self.record(match.group(1))
+
+    def decay(self, factor: float = 0.5) -> None:
+        """Age counts so yesterday's spikes fall out of the top-N"""
+        self._counts = {ticker: count * factor for ticker, count in self._counts.items() if count * factor >= 0.1}
+
+    def top(self, n: int) -> List[str]:
+        return sorted(self._counts, key=self._counts.get, reverse=True)[:n]
+
+@functools.lru_cache()
+def get_ticker_popularity() -> TickerPopularity:
+    return TickerPopularity()
+
+WarmTarget = Callable[[str], Awaitable[Any]]
+
+class CacheWarmer:
+    """Periodically pre-populate cached results for the watchlist plus the most requested tickers.
+
+    Each target is called exactly like a user request would be, so it fills the
+    same cache keys. Calls run at background upstream priority one at a time,
+    and a rate-limit rejection ends the cycle early instead of queueing more work.
+    """
+
+    def __init__(self, targets: Dict[str, WarmTarget], watchlist: List[str], top_n: int,
+                 interval: float, pause: float, popularity: Optional[TickerPopularity] = None):
+        self.targets = targets
+        self.watchlist = [ticker.strip().upper() for ticker in watchlist if ticker.strip()]
+        self.top_n = top_n
+        self.interval = interval
+        self.pause = pause
+        self.popularity = popularity or get_ticker_popularity()
+        self.cycles = 0
+        self.last_cycle_seconds = 0.0
+        self.last_cycle_finished: Optional[float] = None
+        self.last_tickers: List[str] = []
+        self.warmed: Dict[str, Dict[str, float]] = {}
+        self.failures = 0
+        self.rate_limited_cycles = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def tickers(self) -> List[str]:
+        tickers = list(self.watchlist)
+        for ticker in self.popularity.top(self.top_n):
+            if ticker not in tickers:
+                tickers.append(ticker)
+        return tickers
+
+    async def warm_once(self) -> None:
+        started = time.monotonic()
+        tickers = self.tickers()
+        self.last_tickers = tickers
+        logger.info(f"@rayjosong Warming cache for {len(tickers)} tickers: {', '.join(tickers)}")
+
+        try:
+            for ticker in tickers:
+                for name, target in self.targets.items():
+                    try:
+                        with background_priority():
+                            await target(ticker)
+                        self.warmed.setdefault(ticker, {})[name] = time.time()
+                    except RateLimitError:
+                        raise
+                    except Exception as e:
+                        self.failures += 1
+                        logger.warning(f"@rayjosong Cache warm of {name} for {ticker} failed: {str(e)}")
+                    await asyncio.sleep(self.pause)
+        except RateLimitError as e:
+            self.rate_limited_cycles += 1
+            logger.warning(f"@rayjosong Stopping cache warm cycle early: {e.message}")
+
+        self.popularity.decay()
+        self.cycles += 1
+        self.last_cycle_seconds = time.monotonic() - started
+        self.last_cycle_finished = time.time()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.warm_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"@rayjosong Cache warm cycle failed: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        expected = len(self.last_tickers) * len(self.targets)
+        warmed = [
+            self.warmed[ticker][name]
+            for ticker in self.last_tickers for name in self.targets
+            if name in self.warmed.get(ticker, {})
+        ]
+        return {
+            "tickers": self.last_tickers,
+            "targets": list(self.targets),
+            "coverage": round(len(warmed) / expected, 4) if expected else 0.0,
+            # Age of the stalest warmed entry; grows past the interval when warming falls behind
+            "lag_seconds": round(now - min(warmed), 1) if warmed else None,
+            "cycles": self.cycles,
+            "last_cycle_seconds": round(self.last_cycle_seconds, 2),
+            "seconds_since_last_cycle": round(now - self.last_cycle_finished, 1) if self.last_cycle_finished else None,
+            "failures": self.failures,
+            "rate_limited_cycles": self.rate_limited_cycles
+        }
@@ -0,0 +1,88 @@
+from collections import Counter
+from enum import Enum
+from typing import Any, Dict
+import time
+from loguru import logger
+from src.models.errors import CircuitOpenError
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one upstream provider.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail fast with CircuitOpenError. Once ``recovery_timeout`` seconds
+    have passed, up to ``half_open_probes`` calls are let through: a failure
+    re-opens the circuit, and that many successes close it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, recovery_timeout: float, half_open_probes: int):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_probes = half_open_probes
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probes_in_flight = 0
+        self.probe_successes = 0
+        self.rejected = 0
+        self.transitions = Counter()
+
+    def _transition(self, state: CircuitState) -> None:
+        if state == self.state:
+            return
+        logger.warning(f"@rayjosong Circuit for {self.name}: {self.state.value} -> {state.value}")
+        self.transitions[f"{self.state.value}->{state.value}"] += 1
+        self.state = state
+        if state == CircuitState.OPEN:
+            self.opened_at = time.monotonic()
+        self.probes_in_flight = 0
+        self.probe_successes = 0
+
+    def before_call(self) -> None:
+        """Admit a call or raise CircuitOpenError"""
+        if self.state == CircuitState.OPEN and time.monotonic() - self.opened_at >= self.recovery_timeout:
+            self._transition(CircuitState.HALF_OPEN)
+
+        if self.state == CircuitState.OPEN or (
+            self.state == CircuitState.HALF_OPEN and self.probes_in_flight >= self.half_open_probes
+        ):
+            self.rejected += 1
+            raise CircuitOpenError(self.name)
+
+        if self.state == CircuitState.HALF_OPEN:
+            self.probes_in_flight += 1
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        if self.state == CircuitState.HALF_OPEN:
+            self.probes_in_flight -= 1
+            self.probe_successes += 1
+            if self.probe_successes >= self.half_open_probes:
+                self._transition(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == CircuitState.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._transition(CircuitState.OPEN)
+
+    def record_abandoned(self) -> None:
+        """A call was cancelled before it finished, e.g. it lost a hedge race"""
+        if self.state == CircuitState.HALF_OPEN:
+            self.probes_in_flight -= 1
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == CircuitState.OPEN and time.monotonic() - self.opened_at < self.recovery_timeout
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self.consecutive_failures,
+            "rejected": self.rejected,
+            "transitions": dict(self.transitions)
+        }
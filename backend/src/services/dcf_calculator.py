@@ -1,9 +1,41 @@
-from typing import Dict, List, Optional
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 from loguru import logger
-from src.models.stock import IntrinsicValue, DCFAssumption, DCFCalculation
-from src.models.validators import DCFInputs
+from src.cache.keys import input_hash
+from src.models.stock import IntrinsicValue, DCFAssumption, DCFCalculation, DCFValuation
+from src.models.validators import DCFInputs, valid_rates
 from src.models.errors import StockAPIError
 
+# Price-independent valuations kept in process; recomputing one costs microseconds
+FUNDAMENTALS_MEMO_SIZE = 1024
+_fundamentals_memo: "OrderedDict[Tuple[str, str], DCFValuation]" = OrderedDict()
+
+class DCFBatchResult:
+    """DCF outputs for a batch of valuations; every array shares the broadcast input shape.
+
+    ``projected`` and ``present_values`` carry one extra trailing axis for the
+    projection years. Cells where the discount rate does not exceed the terminal
+    rate have no terminal value and are NaN, with ``valid`` set to False.
+    """
+
+    def __init__(self, projected: np.ndarray, present_values: np.ndarray, terminal_value: np.ndarray,
+                 terminal_present_value: np.ndarray, intrinsic_value: np.ndarray, valid: np.ndarray):
+        self.projected = projected
+        self.present_values = present_values
+        self.terminal_value = terminal_value
+        self.terminal_present_value = terminal_present_value
+        self.intrinsic_value = intrinsic_value
+        self.valid = valid
+
+    def upside(self, current_price) -> np.ndarray:
+        price = np.asarray(current_price, dtype="f8")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(price > 0, (self.intrinsic_value - price) / price, np.nan)
+
+def valuation_labels(upside: np.ndarray) -> np.ndarray:
+    return np.where(upside > 0, "Undervalued", "Overvalued")
+
 class DCFCalculator:
     def __init__(self):
         logger.info("@rayjosong Initialized DCFCalculator")
@@ -19,14 +51,7 @@ class DCFCalculator:
 
     def project_cash_flows(self, base_fcf: float, growth_rate: float, years: int) -> List[float]:
         logger.debug(f"@rayjosong Projecting cash flows with {growth_rate} growth for {years} years")
-        cash_flows = []
-        current_fcf = base_fcf
-        
-        for _ in range(years):
-            current_fcf *= (1 + growth_rate)
-            cash_flows.append(current_fcf)
-            
-        return cash_flows
+        return (base_fcf * (1 + growth_rate) ** np.arange(1, years + 1)).tolist()
 
     def calculate_terminal_value(self, final_fcf: float, terminal_growth: float, 
                                discount_rate: float) -> float:
@@ -40,6 +65,119 @@ class DCFCalculator:
         valuation = "Undervalued" if upside > 0 else "Overvalued"
         return upside, valuation
 
+    def value_batch(self, base_fcf, growth_rate, discount_rate, terminal_rate,
+                    projection_years: int = 5) -> DCFBatchResult:
+        """Value many DCFs at once; inputs are scalars or arrays that broadcast together"""
+        base_fcf, growth, discount, terminal = np.broadcast_arrays(
+            *(np.asarray(value, dtype="f8") for value in (base_fcf, growth_rate, discount_rate, terminal_rate))
+        )
+        years = np.arange(1, projection_years + 1)
+
+        projected = base_fcf[..., None] * (1 + growth[..., None]) ** years
+        discount_factors = (1 + discount[..., None]) ** -years
+        present_values = projected * discount_factors
+
+        valid = discount > terminal
+        with np.errstate(divide="ignore", invalid="ignore"):
+            terminal_value = np.where(valid, projected[..., -1] * (1 + terminal) / (discount - terminal), np.nan)
+        terminal_present_value = terminal_value * discount_factors[..., -1]
+        intrinsic_value = present_values.sum(axis=-1) + terminal_present_value
+
+        return DCFBatchResult(projected, present_values, terminal_value, terminal_present_value,
+                              intrinsic_value, valid)
+
+    def sensitivity_grid(self, base_fcf: float, growth_rates, discount_rates, terminal_rates,
+                         projection_years: int = 5) -> DCFBatchResult:
+        """Value every terminal × growth × discount combination in one broadcast pass.
+
+        Results are indexed [terminal, growth, discount]; combinations DCFInputs
+        would reject are NaN and not ``valid``.
+        """
+        terminal = np.asarray(terminal_rates, dtype="f8")[:, None, None]
+        growth = np.asarray(growth_rates, dtype="f8")[None, :, None]
+        discount = np.asarray(discount_rates, dtype="f8")[None, None, :]
+        result = self.value_batch(base_fcf, growth, discount, terminal, projection_years)
+        result.valid = result.valid & valid_rates(growth, discount, terminal) & (base_fcf > 0)
+        result.intrinsic_value = np.where(result.valid, result.intrinsic_value, np.nan)
+        return result
+
+    def value_fundamentals(self, ticker: str, inputs: DCFInputs) -> DCFValuation:
+        """Price-independent DCF; memoized in process per ticker by a hash of its inputs,
+        so new FCF or assumptions miss the memo and are recomputed"""
+        key = (ticker, input_hash(inputs))
+        valuation = _fundamentals_memo.get(key)
+        if valuation is None:
+            valuation = self._value_fundamentals(ticker, inputs, key[1])
+        _fundamentals_memo[key] = valuation
+        _fundamentals_memo.move_to_end(key)
+        while len(_fundamentals_memo) > FUNDAMENTALS_MEMO_SIZE:
+            _fundamentals_memo.popitem(last=False)
+        return valuation
+
+    def _value_fundamentals(self, ticker: str, inputs: DCFInputs, inputs_hash: str) -> DCFValuation:
+        logger.info(f"@rayjosong Using assumptions for {ticker}: growth={inputs.growth_rate}, " + 
+                   f"discount={inputs.discount_rate}, terminal={inputs.terminal_rate}")
+        result = self.value_batch(
+            inputs.base_fcf,
+            inputs.growth_rate,
+            inputs.discount_rate,
+            inputs.terminal_rate,
+            inputs.projection_years
+        )
+        if not result.valid[()]:
+            raise StockAPIError("Discount rate must be greater than terminal growth rate")
+
+        calculations = [
+            DCFCalculation(year=year, fcf=fcf, present_value=present_value)
+            for year, fcf, present_value in zip(
+                range(1, inputs.projection_years + 1),
+                result.projected.tolist(),
+                result.present_values.tolist()
+            )
+        ]
+        logger.info(f"@rayjosong Terminal value for {ticker}: {float(result.terminal_value)}")
+
+        return DCFValuation(
+            intrinsic_value=float(result.intrinsic_value),
+            methodology="DCF",
+            assumptions={
+                "growth_rate": DCFAssumption(
+                    value=inputs.growth_rate,
+                    explanation="Based on historical growth and industry outlook",
+                    data_points=["Historical CAGR", "Industry average"]
+                ),
+                "discount_rate": DCFAssumption(
+                    value=inputs.discount_rate,
+                    explanation="Based on WACC calculation",
+                    data_points=["Risk-free rate", "Market premium", "Beta"]
+                ),
+                "terminal_rate": DCFAssumption(
+                    value=inputs.terminal_rate,
+                    explanation="Based on long-term GDP growth",
+                    data_points=["GDP growth", "Inflation"]
+                )
+            },
+            calculation={"projected_cash_flows": calculations},
+            inputs_hash=inputs_hash
+        )
+
+    def apply_price(self, valuation: DCFValuation, current_price: float,
+                    market_cap: Optional[float]) -> IntrinsicValue:
+        """Overlay a live price on a fundamentals valuation; cheap enough to run per request.
+
+        The DCF values the whole company, so upside is measured against market cap
+        and left unset when market cap is unknown.
+        """
+        upside, status = self.calculate_upside(valuation.intrinsic_value, market_cap) \
+            if market_cap else (None, "Unknown")
+        return IntrinsicValue(
+            current_price=current_price,
+            market_cap=market_cap,
+            upside=upside,
+            valuation=status,
+            **valuation.model_dump(exclude={"inputs_hash"})
+        )
+
     async def calculate_intrinsic_value(self, ticker: str, financial_data: Dict) -> IntrinsicValue:
         logger.info(f"@rayjosong Starting intrinsic value calculation for {ticker}")
         try:
@@ -52,71 +190,12 @@ class DCFCalculator:
                 projection_years=5,
                 base_fcf=financial_data["fcf"]
             )
-            logger.info(f"@rayjosong Using assumptions for {ticker}: growth={inputs.growth_rate}, " + 
-                       f"discount={inputs.discount_rate}, terminal={inputs.terminal_rate}")
-            
-            # Project cash flows
-            projected_flows = self.project_cash_flows(
-                inputs.base_fcf, 
-                inputs.growth_rate, 
-                inputs.projection_years
-            )
-            logger.debug(f"@rayjosong Projected cash flows for {ticker}: {projected_flows}")
-            
-            # Calculate present values
-            calculations = []
-            for year, fcf in enumerate(projected_flows, 1):
-                present_value = fcf / ((1 + inputs.discount_rate) ** year)
-                calculations.append(DCFCalculation(
-                    year=year,
-                    fcf=fcf,
-                    present_value=present_value
-                ))
-            
-            # Calculate terminal value
-            terminal_value = self.calculate_terminal_value(
-                projected_flows[-1], 
-                inputs.terminal_rate, 
-                inputs.discount_rate
-            )
-            logger.info(f"@rayjosong Terminal value for {ticker}: {terminal_value}")
-            
-            # Calculate total value
-            total_present_value = sum(calc.present_value for calc in calculations)
-            terminal_present_value = terminal_value / ((1 + inputs.discount_rate) ** inputs.projection_years)
-            intrinsic_value = total_present_value + terminal_present_value
-            
-            # Calculate upside
-            upside, valuation = self.calculate_upside(intrinsic_value, financial_data["current_price"])
+            valuation = self.value_fundamentals(ticker, inputs)
+            result = self.apply_price(valuation, financial_data["current_price"], financial_data.get("market_cap"))
             logger.info(f"@rayjosong Final valuation for {ticker}: " +
-                       f"Intrinsic={intrinsic_value}, Current={financial_data['current_price']}, " +
-                       f"Upside={upside}, Status={valuation}")
-            
-            return IntrinsicValue(
-                intrinsic_value=intrinsic_value,
-                current_price=financial_data["current_price"],
-                upside=upside,
-                valuation=valuation,
-                methodology="DCF",
-                assumptions={
-                    "growth_rate": DCFAssumption(
-                        value=inputs.growth_rate,
-                        explanation="Based on historical growth and industry outlook",
-                        data_points=["Historical CAGR", "Industry average"]
-                    ),
-                    "discount_rate": DCFAssumption(
-                        value=inputs.discount_rate,
-                        explanation="Based on WACC calculation",
-                        data_points=["Risk-free rate", "Market premium", "Beta"]
-                    ),
-                    "terminal_rate": DCFAssumption(
-                        value=inputs.terminal_rate,
-                        explanation="Based on long-term GDP growth",
-                        data_points=["GDP growth", "Inflation"]
-                    )
-                },
-                calculation={"projected_cash_flows": calculations}
-            )
+                       f"Intrinsic={result.intrinsic_value}, Current={result.current_price}, " +
+                       f"Upside={result.upside}, Status={result.valuation}")
+            return result
             
         except Exception as e:
             logger.error(f"@rayjosong Error in DCF calculation for {ticker}: {str(e)}")
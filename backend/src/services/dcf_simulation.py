@@ -0,0 +1,90 @@
+from typing import Optional
+import functools
+import zlib
+import numpy as np
+from loguru import logger
+from src.config import get_settings
+from src.models.stock import MonteCarloValuation, ValueHistogram
+from src.models.validators import RateDistribution, valid_rates
+from src.services.blocking_executor import BlockingExecutor
+from src.services.dcf_calculator import DCFCalculator
+
+# Paths evaluated per vectorized pass; fixed so a seed replays the same draws
+CHUNK_PATHS = 50000
+PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
+def sample_rates(distribution: RateDistribution, rng: np.random.Generator, size: int) -> np.ndarray:
+    """Draw ``size`` rates; draws outside the DCFInputs bounds are left for the caller to drop"""
+    if distribution.kind == "normal":
+        return rng.normal(distribution.mean, distribution.std, size)
+    if distribution.kind == "uniform":
+        return rng.uniform(distribution.low, distribution.high, size)
+    if distribution.kind == "triangular" and distribution.low < distribution.high:
+        return rng.triangular(distribution.low, distribution.mean, distribution.high, size)
+    return np.full(size, distribution.mean)
+
+class MonteCarloDCF:
+    """Probabilistic DCF: value many sampled (growth, discount, terminal) paths per ticker.
+
+    Paths are evaluated CHUNK_PATHS at a time through the batch engine, so
+    working memory is bounded by the chunk size plus one float per path.
+    Paths that break the DCFInputs rules (a rate out of bounds, or terminal >=
+    growth) are dropped rather than clipped, so no mass piles up at the bounds.
+    Values are for the whole company and are compared against market cap.
+    """
+
+    def __init__(self, calculator: Optional[DCFCalculator] = None):
+        self.calculator = calculator or DCFCalculator()
+
+    def simulate(self, ticker: str, base_fcf: float, current_price: float, market_cap: Optional[float],
+                 growth_rate: RateDistribution,
+                 discount_rate: RateDistribution, terminal_rate: RateDistribution, paths: int,
+                 projection_years: int = 5, seed: Optional[int] = None, bins: int = 50) -> MonteCarloValuation:
+        if seed is None:
+            seed = int(np.random.SeedSequence().entropy % 2 ** 32)
+        # Keyed by ticker so a ticker's draws do not depend on what else is in the request
+        rng = np.random.default_rng([seed, zlib.crc32(ticker.upper().encode())])
+
+        values = np.empty(paths)
+        valid = np.zeros(paths, dtype=bool)
+        for start in range(0, paths, CHUNK_PATHS):
+            size = min(CHUNK_PATHS, paths - start)
+            growth = sample_rates(growth_rate, rng, size)
+            discount = sample_rates(discount_rate, rng, size)
+            terminal = sample_rates(terminal_rate, rng, size)
+            result = self.calculator.value_batch(base_fcf, growth, discount, terminal, projection_years)
+            values[start:start + size] = result.intrinsic_value
+            valid[start:start + size] = result.valid & valid_rates(growth, discount, terminal)
+
+        values = values[valid]
+        if base_fcf <= 0 or not len(values):
+            raise ValueError("No simulated path satisfies the DCF input rules")
+
+        percentiles = np.percentile(values, (1,) + PERCENTILES + (99,))
+        counts, edges = np.histogram(np.clip(values, percentiles[0], percentiles[-1]), bins=bins)
+        logger.info(f"@rayjosong Simulated {len(values)}/{paths} valid DCF paths for {ticker} (seed {seed})")
+
+        return MonteCarloValuation(
+            ticker=ticker.upper(),
+            current_price=current_price,
+            market_cap=market_cap,
+            base_fcf=base_fcf,
+            seed=seed,
+            paths=paths,
+            valid_paths=len(values),
+            mean=float(values.mean()),
+            std=float(values.std()),
+            percentiles={f"p{p}": float(v) for p, v in zip(PERCENTILES, percentiles[1:-1])},
+            probability_undervalued=float(np.mean(values > market_cap)) if market_cap else None,
+            histogram=ValueHistogram(edges=edges.tolist(), counts=counts.tolist())
+        )
+
+@functools.lru_cache()
+def get_simulation_executor() -> BlockingExecutor:
+    settings = get_settings()
+    return BlockingExecutor(
+        "dcf_simulation",
+        max_workers=settings.monte_carlo_max_workers,
+        max_queue=settings.monte_carlo_max_tickers,
+        timeout=settings.monte_carlo_timeout_seconds
+    )
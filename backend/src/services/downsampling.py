@@ -0,0 +1,41 @@
+import numpy as np
+
+INTERVAL_UNITS = {"1d": "D", "1wk": "W", "1mo": "M"}
+
+def resample_last(dates: np.ndarray, interval: str) -> np.ndarray:
+    """Indices of the last trading day in each interval bucket (daily input)"""
+    unit = INTERVAL_UNITS[interval]
+    if unit == "D" or len(dates) == 0:
+        return np.arange(len(dates))
+    if unit == "W":
+        # numpy weeks start on Thursday (the epoch); shift so buckets run Monday to Sunday
+        dates = dates + np.timedelta64(3, "D")
+    buckets = dates.astype(f"datetime64[{unit}]")
+    return np.append(np.flatnonzero(buckets[1:] != buckets[:-1]), len(dates) - 1)
+
+def minmax_downsample(values: np.ndarray, max_points: int) -> np.ndarray:
+    """Indices of a shape-preserving subset of at most ``max_points`` values.
+
+    The series is cut into equal buckets and each bucket keeps its minimum and
+    maximum in time order, so peaks and troughs survive; the first and last
+    points are always kept.
+    """
+    n = len(values)
+    if n <= max_points:
+        return np.arange(n)
+    if max_points < 4:
+        raise ValueError("max_points must be at least 4")
+
+    buckets = (max_points - 2) // 2
+    size = -(-(n - 2) // buckets)
+    inner = values[1:n - 1].astype("f8")
+    padded = np.full(buckets * size, np.nan)
+    padded[:len(inner)] = inner
+    grid = padded.reshape(buckets, size)
+
+    # Buckets at the tail may be pure padding; skip them
+    filled = ~np.all(np.isnan(grid), axis=1)
+    offsets = np.arange(buckets)[filled] * size + 1
+    lows = np.nanargmin(grid[filled], axis=1) + offsets
+    highs = np.nanargmax(grid[filled], axis=1) + offsets
+    return np.unique(np.concatenate(([0], lows, highs, [n - 1])))
@@ -0,0 +1,31 @@
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Tuple
+import asyncio
+from loguru import logger
+
+class FetchPlanner:
+    """Resolve the upstream endpoints a set of operations needs and fetch them concurrently"""
+
+    def __init__(self, requirements: Dict[str, Tuple[str, ...]]):
+        self.requirements = requirements
+
+    def plan(self, operations: Iterable[str]) -> List[str]:
+        """Return the de-duplicated endpoints required by the given operations"""
+        endpoints: List[str] = []
+        for operation in operations:
+            for endpoint in self.requirements[operation]:
+                if endpoint not in endpoints:
+                    endpoints.append(endpoint)
+        return endpoints
+
+    async def execute(self, operations: Iterable[str],
+                      fetch: Callable[[str], Awaitable[Dict]]) -> Dict[str, Any]:
+        """Issue every planned endpoint at once.
+
+        Failed endpoints map to their exception so callers can decide which
+        failures are fatal for the response they are assembling.
+        """
+        endpoints = self.plan(operations)
+        logger.debug(f"@rayjosong Fetch plan: {endpoints}")
+        results = await asyncio.gather(*(fetch(endpoint) for endpoint in endpoints),
+                                       return_exceptions=True)
+        return dict(zip(endpoints, results))
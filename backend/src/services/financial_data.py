@@ -1,16 +1,27 @@
 from typing import Dict, Optional
-import requests
+import httpx
 from loguru import logger
+from src.config import get_settings
 from src.models.stock import StockInfo
 from src.models.errors import StockNotFoundError, StockAPIError
 import json 
+from .http_client import get_http_client
+from .upstream_scheduler import get_upstream_scheduler
 
 class FinancialDataService:
     def __init__(self, api_key: str):
         self.api_key = api_key
-        self.base_url = "https://www.alphavantage.co/query"
+        settings = get_settings()
+        self.base_url = settings.alpha_vantage_base_url
+        self.timeout = settings.http_timeout_seconds
         logger.info("@rayjosong Initialized FinancialDataService")
 
+    async def _query(self, params: Dict) -> Dict:
+        await get_upstream_scheduler().acquire("Alpha Vantage")
+        response = await get_http_client().get(self.base_url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
     async def get_current_price(self, ticker: str) -> float:
         """Get the current price for a ticker using Alpha Vantage's GLOBAL_QUOTE endpoint"""
         logger.debug(f"@rayjosong Fetching current price for {ticker}")
@@ -22,9 +33,7 @@ class FinancialDataService:
         
         try:
             logger.info(f"@rayjosong Making API request to Alpha Vantage for {ticker} current price")
-            response = requests.get(self.base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = await self._query(params)
             
             logger.debug(f"@rayjosong Raw price API response for {ticker}: {json.dumps(data, indent=4)}")
             
@@ -50,9 +59,7 @@ class FinancialDataService:
         
         try:
             logger.info(f"@rayjosong Making API request to Alpha Vantage for {ticker} overview")
-            response = requests.get(self.base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = await self._query(params)
             
             logger.debug(f"@rayjosong Raw API response for {ticker}: {json.dumps(data, indent=4)}")
             
@@ -74,7 +81,7 @@ class FinancialDataService:
             logger.info(f"@rayjosong Successfully retrieved stock info for {ticker}: {stock_info}")
             return stock_info
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"@rayjosong API request failed for {ticker}: {str(e)}")
             raise StockAPIError(f"Failed to fetch stock data: {str(e)}")
         except Exception as e:
@@ -91,9 +98,7 @@ class FinancialDataService:
         
         try:
             logger.info(f"@rayjosong Making API request to Alpha Vantage for {ticker} cash flow data")
-            response = requests.get(self.base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = await self._query(params)
             
             logger.debug(f"@rayjosong Raw cash flow API response for {ticker}: {data}")
             
@@ -1,10 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Dict, List, Tuple, Union
+import asyncio
 from src.models.stock import StockInfo
-from fastapi_cache.decorator import cache
+from src.cache.decorator import cache
 from datetime import timedelta
 from loguru import logger
 from fastapi_cache import FastAPICache
+from src.cache.keys import cache_key as build_cache_key
 
 class FinancialDataProvider(ABC):
     """Abstract base class for financial data providers"""
@@ -23,8 +25,24 @@ class FinancialDataProvider(ABC):
         logger.info(f"@rayjosong Executing get_financial_metrics for {ticker}")
         pass
 
-    async def _log_cache_usage(self, func_name: str, ticker: str):
-        cache_key = f"{func_name}:{ticker}"
+    async def get_valuation_inputs(self, ticker: str) -> Tuple[StockInfo, Dict]:
+        """Get stock info and financial metrics together, fetched concurrently through their cached paths"""
+        stock_info, financial_metrics = await asyncio.gather(
+            self.get_stock_info(ticker),
+            self.get_financial_metrics(ticker)
+        )
+        return stock_info, financial_metrics
+
+    async def get_stock_infos(self, tickers: List[str]) -> Dict[str, Union[StockInfo, Exception]]:
+        """Get stock info for many tickers; failures are returned per ticker, not raised"""
+        outcomes = await asyncio.gather(*(self.get_stock_info(ticker) for ticker in tickers),
+                                        return_exceptions=True)
+        return dict(zip(tickers, outcomes))
+
+    async def _log_cache_usage(self, func_name: str, ticker: str, namespace: str = ""):
+        method = getattr(type(self), func_name)
+        cache_key = build_cache_key(f"{FastAPICache.get_prefix()}:{namespace}", method.__qualname__,
+                                    self.provider_name, ticker)
         try:
             # Check if cache exists by trying to get the value
             cached_value = await FastAPICache.get_backend().get(cache_key)
@@ -0,0 +1,169 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+import functools
+import os
+import sqlite3
+import threading
+import time
+from loguru import logger
+from src.config import get_settings
+
+class FundamentalsStore:
+    """On-disk annual cash flow statements per (provider, ticker), keyed by fiscal year end.
+
+    Annual statements only change once a year, so upstream is asked again only
+    once a new fiscal year has ended and its filing could be out (the filing
+    lag is the earliest that happens), and then at most once per recheck
+    interval until the new period shows up.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS annual_cash_flow (
+            provider TEXT NOT NULL,
+            ticker TEXT NOT NULL,
+            fiscal_date TEXT NOT NULL,
+            operating_cash_flow REAL NOT NULL,
+            capital_expenditure REAL NOT NULL,
+            fcf REAL NOT NULL,
+            fetched_at REAL NOT NULL,
+            PRIMARY KEY (provider, ticker, fiscal_date)
+        );
+        CREATE TABLE IF NOT EXISTS refresh_log (
+            provider TEXT NOT NULL,
+            ticker TEXT NOT NULL,
+            checked_at REAL NOT NULL,
+            PRIMARY KEY (provider, ticker)
+        );
+    """
+
+    # Rows stored before fiscal dates were validated may hold placeholders like "Unknown"
+    VALID_DATE = "fiscal_date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'"
+
+    def __init__(self, path: str, filing_lag_days: int, recheck_hours: float):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.filing_lag = timedelta(days=filing_lag_days)
+        self.recheck_seconds = recheck_hours * 3600
+        self.local_hits = 0
+        self.refreshes = 0
+        # Queries are sub-millisecond local reads, so they run inline on the event loop
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self.SCHEMA)
+
+    def latest(self, provider: str, ticker: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fiscal_date, operating_cash_flow, capital_expenditure, fcf FROM annual_cash_flow "
+                f"WHERE provider = ? AND ticker = ? AND {self.VALID_DATE} ORDER BY fiscal_date DESC LIMIT 1",
+                (provider, ticker.upper())
+            ).fetchone()
+        return dict(row) if row else None
+
+    def history(self, provider: str, ticker: str) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT fiscal_date, operating_cash_flow, capital_expenditure, fcf FROM annual_cash_flow "
+                f"WHERE provider = ? AND ticker = ? AND {self.VALID_DATE} ORDER BY fiscal_date DESC",
+                (provider, ticker.upper())
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def needs_refresh(self, provider: str, ticker: str, today: Optional[date] = None) -> bool:
+        latest = self.latest(provider, ticker)
+        if latest is None:
+            return True
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT checked_at FROM refresh_log WHERE provider = ? AND ticker = ?",
+                (provider, ticker.upper())
+            ).fetchone()
+        if row is None:
+            # Never checked, or the check was forgotten to force a refresh
+            return True
+
+        try:
+            fiscal_end = date.fromisoformat(latest["fiscal_date"])
+        except ValueError:
+            return True
+        today = today or date.today()
+        if today < fiscal_end + timedelta(days=365) + self.filing_lag:
+            return False
+        return time.time() - row["checked_at"] >= self.recheck_seconds
+
+    def stored(self, provider: str, ticker: str, fallback: bool = False) -> Optional[Dict]:
+        """Latest stored period when it is current (or, as a fallback, whenever one exists)"""
+        if not fallback and self.needs_refresh(provider, ticker):
+            return None
+        latest = self.latest(provider, ticker)
+        if latest is not None:
+            self.local_hits += 1
+        return latest
+
+    def forget_checks(self, ticker: str) -> int:
+        """Drop a ticker's refresh checks so its next request asks upstream again"""
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM refresh_log WHERE ticker = ?", (ticker.upper(),)).rowcount
+
+    def save(self, provider: str, ticker: str, periods: List[Dict]) -> int:
+        """Upsert annual periods and record the check; returns how many periods were new"""
+        now = time.time()
+        ticker = ticker.upper()
+        self.refreshes += 1
+        periods = [period for period in periods if valid_fiscal_date(period["fiscal_date"])]
+        with self._lock, self._conn:
+            known = {
+                row["fiscal_date"] for row in self._conn.execute(
+                    "SELECT fiscal_date FROM annual_cash_flow WHERE provider = ? AND ticker = ?",
+                    (provider, ticker)
+                )
+            }
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO annual_cash_flow VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (provider, ticker, period["fiscal_date"], period["operating_cash_flow"],
+                     period["capital_expenditure"], period["fcf"], now)
+                    for period in periods
+                ]
+            )
+            self._conn.execute("INSERT OR REPLACE INTO refresh_log VALUES (?, ?, ?)", (provider, ticker, now))
+        added = len({period["fiscal_date"] for period in periods} - known)
+        if added:
+            logger.info(f"@rayjosong Stored {added} new annual periods for {ticker} from {provider}")
+        return added
+
+    def stats(self) -> Dict:
+        with self._lock:
+            tickers, periods = self._conn.execute(
+                "SELECT COUNT(DISTINCT provider || ':' || ticker), COUNT(*) FROM annual_cash_flow"
+            ).fetchone()
+        return {"tickers": tickers, "periods": periods, "local_hits": self.local_hits, "refreshes": self.refreshes}
+
+    def close(self) -> None:
+        self._conn.close()
+
+def valid_fiscal_date(value: str) -> bool:
+    try:
+        date.fromisoformat(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+def fiscal_date(value) -> str:
+    """ISO date for a fiscal period label from either provider (string or Timestamp)"""
+    if isinstance(value, (datetime, date)):
+        return value.strftime("%Y-%m-%d")
+    return str(value)[:10]
+
+@functools.lru_cache()
+def get_fundamentals_store() -> FundamentalsStore:
+    settings = get_settings()
+    return FundamentalsStore(
+        settings.fundamentals_db_path,
+        settings.fundamentals_filing_lag_days,
+        settings.fundamentals_recheck_hours
+    )
@@ -0,0 +1,36 @@
+from typing import Optional
+import httpx
+from loguru import logger
+from src.config import get_settings
+
+_client: Optional[httpx.AsyncClient] = None
+
+def _build_client() -> httpx.AsyncClient:
+    settings = get_settings()
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry_seconds
+    )
+    timeout = httpx.Timeout(
+        settings.http_timeout_seconds,
+        connect=settings.http_connect_timeout_seconds
+    )
+    logger.info(f"@rayjosong Creating shared HTTP client: max_connections={settings.http_max_connections}, " +
+                f"keepalive={settings.http_max_keepalive_connections}, timeout={settings.http_timeout_seconds}s")
+    return httpx.AsyncClient(limits=limits, timeout=timeout)
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the app-lifetime HTTP client, creating it on first use"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client and release pooled connections"""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+        logger.info("@rayjosong Closed shared HTTP client")
+    _client = None
@@ -4,6 +4,7 @@ from loguru import logger
 import httpx
 from fastapi import HTTPException
 from dataclasses import dataclass
+from src.config import get_settings
 
 @dataclass
 class AnalysisResult:
@@ -11,7 +12,6 @@ class AnalysisResult:
     status: str
 
 class MoatAnalyzer:
-    OLLAMA_URL = "http://localhost:11434/api/generate"
     PROMPT_TEMPLATE = """
     Analyze {company}'s economic moat based on:
     1. Brand Power
@@ -58,6 +58,7 @@ class MoatAnalyzer:
 
     def __init__(self, data_provider):
         self.data_provider = data_provider
+        self.ollama_base_url = get_settings().ollama_base_url.rstrip("/")
 
     def analyze(self) -> AnalysisResult:
         """Perform financial analysis"""
@@ -76,7 +77,7 @@ class MoatAnalyzer:
             
             async with httpx.AsyncClient() as client:
                 # Verify Ollama is running
-                health_check = await client.get("http://localhost:11434", timeout=5.0)
+                health_check = await client.get(self.ollama_base_url, timeout=5.0)
                 if health_check.status_code != 200:
                     logger.error("@rayjosong Ollama server is not running")
                     return self._fallback_response(company_name)
@@ -95,7 +96,7 @@ class MoatAnalyzer:
                 }
                 
                 response = await client.post(
-                    self.OLLAMA_URL,
+                    f"{self.ollama_base_url}/api/generate",
                     json=request_data,
                     timeout=60.0
                 )
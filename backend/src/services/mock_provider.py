@@ -3,9 +3,8 @@ from loguru import logger
 from src.models.stock import StockInfo
 from src.models.errors import StockNotFoundError, StockAPIError
 from .financial_data_provider import FinancialDataProvider
-from fastapi_cache.decorator import cache
+from src.cache.decorator import cache
 from datetime import timedelta
-import fastapi_cache
 
 class MockProvider(FinancialDataProvider):
     def __init__(self):
@@ -18,16 +17,7 @@ class MockProvider(FinancialDataProvider):
 
     @cache(expire=timedelta(hours=1))
     async def get_stock_info(self, ticker: str) -> StockInfo:
-        cache_key = self._generate_cache_key(ticker, "get_stock_info")
-        logger.info(f"@rayjosong Checking cache for {ticker} stock info")
-        
-        # Manual cache check
-        cached = await fastapi_cache.FastAPICache.get_backend().get(cache_key)
-        if cached:
-            logger.info(f"@rayjosong Cache hit for {ticker} stock info")
-            return cached
-            
-        logger.info(f"@rayjosong Cache miss, returning mock data for {ticker}")
+        logger.info(f"@rayjosong Returning mock data for {ticker}")
         
         # Hardcoded response
         return StockInfo(
@@ -36,7 +26,8 @@ class MockProvider(FinancialDataProvider):
             current_price=100.0,
             currency="USD",
             sector="Technology",
-            industry="Software"
+            industry="Software",
+            market_cap=10000000000.0
         )
 
     @cache(expire=timedelta(hours=1))
@@ -0,0 +1,233 @@
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+import functools
+import os
+import struct
+import time
+import numpy as np
+import pandas as pd
+from loguru import logger
+from src.config import get_settings
+
+COLUMNS = ("date", "open", "high", "low", "close", "volume")
+_DTYPES = {
+    "date": np.dtype("datetime64[D]"),
+    "open": np.dtype("<f8"),
+    "high": np.dtype("<f8"),
+    "low": np.dtype("<f8"),
+    "close": np.dtype("<f8"),
+    "volume": np.dtype("<i8")
+}
+_FRAME_COLUMNS = {"open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"}
+
+# magic, version, capacity, length, covered_from (days since epoch), checked_at (unix time)
+_HEADER = struct.Struct("<4sIQQqd")
+_HEADER_SIZE = 64
+_MAGIC = b"PXS1"
+_VERSION = 1
+_MIN_CAPACITY = 256
+
+# covered_from value meaning the whole available history is stored
+FULL_HISTORY = -(2 ** 62)
+
+_PERIOD_DAYS = {"1d": 1, "5d": 5, "1mo": 30, "3mo": 90, "6mo": 180, "1y": 365, "2y": 730, "5y": 1825, "10y": 3650}
+
+def period_start(period: str, today: Optional[date] = None) -> Optional[date]:
+    """First calendar day a yfinance-style period covers; None for 'max'"""
+    today = today or date.today()
+    if period == "max":
+        return None
+    if period == "ytd":
+        return date(today.year, 1, 1)
+    if period not in _PERIOD_DAYS:
+        raise ValueError(f"Unsupported period {period}")
+    return today - timedelta(days=_PERIOD_DAYS[period])
+
+def period_covering(days: int) -> str:
+    """Smallest yfinance period that reaches back at least ``days`` calendar days"""
+    for period, span in _PERIOD_DAYS.items():
+        if span >= days:
+            return period
+    return "max"
+
+class PriceSeries:
+    """Daily OHLCV columns for one ticker; slices are views, never copies"""
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.columns["date"])
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        try:
+            return self.__dict__["columns"][name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def between(self, start: Optional[date], end: Optional[date] = None) -> "PriceSeries":
+        dates = self.columns["date"]
+        lo = 0 if start is None else int(np.searchsorted(dates, np.datetime64(start, "D"), side="left"))
+        hi = len(dates) if end is None else int(np.searchsorted(dates, np.datetime64(end, "D"), side="right"))
+        return PriceSeries({name: column[lo:hi] for name, column in self.columns.items()})
+
+    def to_dict(self) -> Dict[str, List]:
+        result = {"dates": np.datetime_as_string(self.columns["date"], unit="D").tolist()}
+        for name in COLUMNS[1:]:
+            result[name] = self.columns[name].tolist()
+        return result
+
+def frame_columns(frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Columns from a yfinance history frame, one row per trading day"""
+    index = pd.DatetimeIndex(frame.index)
+    if index.tz is not None:
+        # Keep the exchange-local calendar date
+        index = index.tz_localize(None)
+    columns = {"date": index.normalize().values.astype("datetime64[D]")}
+    for name, source in _FRAME_COLUMNS.items():
+        values = frame[source].to_numpy(dtype="f8", na_value=np.nan) if source in frame else np.full(len(frame), np.nan)
+        columns[name] = np.nan_to_num(values).astype("<i8") if name == "volume" else values
+    order = np.argsort(columns["date"], kind="stable")
+    return {name: column[order] for name, column in columns.items()}
+
+class _TickerFile:
+    def __init__(self, path: str):
+        self.path = path
+        self.mmap = np.memmap(path, dtype=np.uint8, mode="r+")
+        _, _, self.capacity, self.length, self.covered_from, self.checked_at = \
+            _HEADER.unpack_from(self.mmap[:_HEADER.size].tobytes())
+        self.arrays = {
+            name: self.mmap[self._offset(i):self._offset(i + 1)].view(_DTYPES[name])
+            for i, name in enumerate(COLUMNS)
+        }
+
+    def _offset(self, column: int) -> int:
+        return _HEADER_SIZE + column * self.capacity * 8
+
+    def series(self) -> PriceSeries:
+        return PriceSeries({name: array[:self.length] for name, array in self.arrays.items()})
+
+    def write_header(self) -> None:
+        self.mmap[:_HEADER.size] = np.frombuffer(
+            _HEADER.pack(_MAGIC, _VERSION, self.capacity, self.length, self.covered_from, self.checked_at),
+            dtype=np.uint8
+        )
+        self.mmap.flush()
+
+class PriceHistoryStore:
+    """One memory-mapped column file per ticker holding daily date/OHLC/volume.
+
+    Each file is a fixed header followed by the six columns, each sized for
+    ``capacity`` rows. Appends write the new rows in place and then bump the
+    length in the header; a file that runs out of room is rewritten at double
+    capacity and swapped in atomically.
+    """
+
+    def __init__(self, root: str, max_open: int = 256):
+        self.root = root
+        self.max_open = max_open
+        self._files: "OrderedDict[str, _TickerFile]" = OrderedDict()
+        self.appended_rows = 0
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, ticker: str) -> str:
+        return os.path.join(self.root, f"{ticker.upper()}.px")
+
+    def _open(self, ticker: str) -> Optional[_TickerFile]:
+        key = ticker.upper()
+        handle = self._files.get(key)
+        if handle is None:
+            path = self._path(key)
+            if not os.path.exists(path):
+                return None
+            try:
+                handle = _TickerFile(path)
+            except (ValueError, struct.error) as e:
+                logger.warning(f"@rayjosong Ignoring unreadable price file {path}: {str(e)}")
+                return None
+            self._files[key] = handle
+            while len(self._files) > self.max_open:
+                self._files.popitem(last=False)
+        self._files.move_to_end(key)
+        return handle
+
+    def read(self, ticker: str) -> Optional[PriceSeries]:
+        handle = self._open(ticker)
+        return handle.series() if handle is not None else None
+
+    def coverage(self, ticker: str):
+        """(covered_from days, last stored date or None, checked_at) for a stored ticker"""
+        handle = self._open(ticker)
+        if handle is None:
+            return None
+        last = handle.arrays["date"][handle.length - 1] if handle.length else None
+        return handle.covered_from, last, handle.checked_at
+
+    def _create(self, ticker: str, columns: Dict[str, np.ndarray], covered_from: int) -> None:
+        rows = len(columns["date"])
+        capacity = max(_MIN_CAPACITY, 1 << max(rows - 1, 0).bit_length())
+        path = self._path(ticker)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, capacity, rows, covered_from, time.time()).ljust(_HEADER_SIZE, b"\0"))
+            for name in COLUMNS:
+                column = np.zeros(capacity, dtype=_DTYPES[name])
+                column[:rows] = columns[name]
+                f.write(column.tobytes())
+        os.replace(tmp_path, path)
+        self._files.pop(ticker.upper(), None)
+
+    def replace(self, ticker: str, columns: Dict[str, np.ndarray], covered_from: int) -> None:
+        """Store a freshly fetched full period; fetched rows win over stored rows on the same day"""
+        existing = self.read(ticker)
+        if existing is not None and len(existing):
+            kept = ~np.isin(existing.columns["date"], columns["date"])
+            merged = {name: np.concatenate([existing.columns[name][kept], columns[name]]) for name in COLUMNS}
+            order = np.argsort(merged["date"], kind="stable")
+            columns = {name: column[order] for name, column in merged.items()}
+        self._create(ticker, columns, covered_from)
+        logger.info(f"@rayjosong Stored {len(columns['date'])} daily prices for {ticker}")
+
+    def append(self, ticker: str, columns: Dict[str, np.ndarray]) -> int:
+        """Add rows from the last stored day on; returns how many new days were added.
+
+        The last stored day is overwritten when it is refetched, so a partial
+        bar for today keeps updating until the day closes.
+        """
+        handle = self._open(ticker)
+        if handle is None:
+            raise KeyError(ticker)
+
+        start = handle.length
+        if handle.length:
+            last = handle.arrays["date"][handle.length - 1]
+            newer = columns["date"] >= last
+            columns = {name: column[newer] for name, column in columns.items()}
+            if len(columns["date"]) and columns["date"][0] == last:
+                start -= 1
+        end = start + len(columns["date"])
+        added = max(end - handle.length, 0)
+
+        if end > handle.capacity:
+            series = handle.series()
+            merged = {name: np.concatenate([series.columns[name][:start], columns[name]]) for name in COLUMNS}
+            self._create(ticker, merged, handle.covered_from)
+        else:
+            for name in COLUMNS:
+                handle.arrays[name][start:end] = columns[name]
+            handle.length = max(end, handle.length)
+            handle.checked_at = time.time()
+            # Publish the rows only after they are written
+            handle.write_header()
+
+        self.appended_rows += added
+        return added
+
+    def stats(self) -> Dict:
+        return {"open_files": len(self._files), "appended_rows": self.appended_rows}
+
+@functools.lru_cache()
+def get_price_store() -> PriceHistoryStore:
+    settings = get_settings()
+    return PriceHistoryStore(settings.price_store_path, settings.price_store_max_open)
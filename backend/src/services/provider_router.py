@@ -0,0 +1,226 @@
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional, Tuple, Union
+import asyncio
+import time
+from loguru import logger
+from src.config import get_settings
+from src.cache.keys import normalize_ticker
+from src.models.stock import StockInfo
+from src.models.errors import CustomHTTPException, StockNotFoundError
+from .financial_data_provider import FinancialDataProvider
+from .circuit_breaker import CircuitBreaker
+from .price_store import PriceSeries
+
+class ProviderStats:
+    """Rolling latency and error window for one provider"""
+
+    def __init__(self, window: int):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.fallback_wins = 0
+
+    def record(self, latency: float, ok: bool) -> None:
+        self.latencies.append(latency)
+        self.outcomes.append(ok)
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return 1 - sum(self.outcomes) / len(self.outcomes)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def score(self) -> float:
+        """Lower is better: median latency inflated by the recent error rate"""
+        median = self.percentile(0.5) or 0.0
+        return median * (1 + 10 * self.error_rate()) + self.error_rate()
+
+class ProviderRouter(FinancialDataProvider):
+    """Route provider calls to the healthiest upstream, hedging slow calls.
+
+    Providers are ranked by rolling latency and error rate. When the chosen
+    provider has not answered within its recent p95 latency, the same call
+    is sent to the next provider and whichever succeeds first wins. Errors
+    fail over to the next provider immediately.
+
+    Each provider sits behind a circuit breaker, so a degraded upstream fails
+    fast instead of tying up workers. When every provider fails, the last
+    good result for the same call is served if one is held.
+    """
+
+    def __init__(self, providers: List[FinancialDataProvider]):
+        settings = get_settings()
+        self.provider_name = "router"
+        self.providers = providers
+        self.hedging_enabled = settings.hedging_enabled
+        self.hedge_percentile = settings.hedge_percentile
+        self.hedge_min_delay = settings.hedge_min_delay_ms / 1000
+        self.hedge_default_delay = settings.hedge_default_delay_ms / 1000
+        self.min_samples = settings.hedge_min_samples
+        self.stats = {provider.provider_name: ProviderStats(settings.router_window) for provider in providers}
+        self.breakers = {
+            provider.provider_name: CircuitBreaker(
+                provider.provider_name,
+                failure_threshold=settings.circuit_failure_threshold,
+                recovery_timeout=settings.circuit_recovery_seconds,
+                half_open_probes=settings.circuit_half_open_probes
+            )
+            for provider in providers
+        }
+        self.stale_max_entries = settings.stale_fallback_max_entries
+        self._last_good: OrderedDict = OrderedDict()
+        self.stale_served = 0
+        logger.info(f"@rayjosong Initialized ProviderRouter with {[p.provider_name for p in providers]}")
+
+    def _ranked(self, operation: str) -> List[FinancialDataProvider]:
+        capable = [provider for provider in self.providers if hasattr(provider, operation)]
+        # sorted() is stable, so ties keep the configured preference order
+        return sorted(capable, key=lambda provider: (
+            self.breakers[provider.provider_name].is_open,
+            self.stats[provider.provider_name].score()
+        ))
+
+    def _hedge_delay(self, provider: FinancialDataProvider) -> float:
+        stats = self.stats[provider.provider_name]
+        if len(stats.latencies) < self.min_samples:
+            return self.hedge_default_delay
+        return max(stats.percentile(self.hedge_percentile), self.hedge_min_delay)
+
+    async def _timed(self, provider: FinancialDataProvider, operation: str, *args) -> Any:
+        breaker = self.breakers[provider.provider_name]
+        breaker.before_call()
+        started = time.perf_counter()
+        try:
+            result = await getattr(provider, operation)(*args)
+        except asyncio.CancelledError:
+            breaker.record_abandoned()
+            raise
+        except StockNotFoundError:
+            # The upstream answered; the ticker simply does not exist
+            breaker.record_success()
+            self.stats[provider.provider_name].record(time.perf_counter() - started, True)
+            raise
+        except Exception:
+            breaker.record_failure()
+            self.stats[provider.provider_name].record(time.perf_counter() - started, False)
+            raise
+        breaker.record_success()
+        self.stats[provider.provider_name].record(time.perf_counter() - started, True)
+        return result
+
+    def _remember(self, key: Tuple, result: Any) -> None:
+        self._last_good[key] = result
+        self._last_good.move_to_end(key)
+        while len(self._last_good) > self.stale_max_entries:
+            self._last_good.popitem(last=False)
+
+    def forget(self, ticker: str) -> int:
+        """Drop last-good fallbacks for a ticker so stale data cannot outlive an invalidation"""
+        ticker = ticker.upper()
+        keys = [key for key in self._last_good if isinstance(key[1], str) and key[1].upper() == ticker]
+        for key in keys:
+            del self._last_good[key]
+        return len(keys)
+
+    def _stale_or_raise(self, key: Tuple, error: Exception) -> Any:
+        if key in self._last_good:
+            logger.warning(f"@rayjosong All providers failed {key}, serving last good result")
+            self.stale_served += 1
+            return self._last_good[key]
+        raise error
+
+    async def _call(self, operation: str, *args, hedge: bool = True, stale: bool = True) -> Any:
+        key = (operation, *args)
+        candidates = self._ranked(operation)
+        if not candidates:
+            raise CustomHTTPException(501, {
+                "developer_message": f"No configured provider supports {operation}",
+                "user_message": "This data is not available from the configured data providers",
+                "error_code": "OPERATION_NOT_SUPPORTED"
+            })
+
+        pending: Dict[asyncio.Task, FinancialDataProvider] = {}
+        remaining = iter(candidates)
+        last_launched: Optional[FinancialDataProvider] = None
+        last_error: Optional[Exception] = None
+
+        def launch_next() -> bool:
+            nonlocal last_launched
+            provider = next(remaining, None)
+            if provider is None:
+                return False
+            if pending:
+                logger.info(f"@rayjosong Hedging {operation}{args} to {provider.provider_name}")
+            pending[asyncio.ensure_future(self._timed(provider, operation, *args))] = provider
+            last_launched = provider
+            return True
+
+        launch_next()
+        try:
+            while pending:
+                timeout = self._hedge_delay(last_launched) if hedge and self.hedging_enabled else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    launch_next()
+                    continue
+
+                for task in done:
+                    provider = pending.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        if provider is not candidates[0]:
+                            self.stats[provider.provider_name].fallback_wins += 1
+                        if stale:
+                            self._remember(key, task.result())
+                        return task.result()
+                    if isinstance(error, StockNotFoundError):
+                        raise error
+                    logger.warning(f"@rayjosong {provider.provider_name} failed {operation}{args}: {str(error)}")
+                    last_error = error
+
+                if not pending and not launch_next():
+                    if stale:
+                        return self._stale_or_raise(key, last_error)
+                    raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def get_stock_info(self, ticker: str) -> StockInfo:
+        return await self._call("get_stock_info", normalize_ticker(ticker))
+
+    async def get_financial_metrics(self, ticker: str) -> Dict:
+        return await self._call("get_financial_metrics", normalize_ticker(ticker))
+
+    async def get_valuation_inputs(self, ticker: str) -> Tuple[StockInfo, Dict]:
+        return await self._call("get_valuation_inputs", normalize_ticker(ticker))
+
+    async def get_current_price(self, ticker: str) -> float:
+        return await self._call("get_current_price", normalize_ticker(ticker))
+
+    async def get_historical_data(self, ticker: str, period: str = "1y") -> PriceSeries:
+        return await self._call("get_historical_data", normalize_ticker(ticker), period)
+
+    async def get_stock_infos(self, tickers: List[str]) -> Dict[str, Union[StockInfo, Exception]]:
+        # Bulk downloads are too expensive to duplicate, so batches fail over but never hedge
+        return await self._call("get_stock_infos", [normalize_ticker(ticker) for ticker in tickers],
+                                hedge=False, stale=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        providers = {
+            name: {
+                "samples": len(stats.latencies),
+                "error_rate": round(stats.error_rate(), 4),
+                "p50_ms": round((stats.percentile(0.5) or 0) * 1000, 2),
+                "p95_ms": round((stats.percentile(0.95) or 0) * 1000, 2),
+                "p99_ms": round((stats.percentile(0.99) or 0) * 1000, 2),
+                "fallback_wins": stats.fallback_wins,
+                "circuit": self.breakers[name].stats()
+            }
+            for name, stats in self.stats.items()
+        }
+        return {"providers": providers, "stale_served": self.stale_served}
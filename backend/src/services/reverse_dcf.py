@@ -0,0 +1,100 @@
+from typing import Dict, Optional
+import numpy as np
+from loguru import logger
+from src.models.validators import input_bounds, valid_rates
+from src.services.dcf_calculator import DCFCalculator
+
+SOLVABLE_RATES = ("growth_rate", "discount_rate")
+
+class ReverseDCF:
+    """Market-implied DCF rates: the growth (or discount) rate at which the
+    DCF value equals a target, solved for many tickers at once.
+
+    Intrinsic value is monotonic in either rate, so each ticker's root is
+    bracketed by the DCFInputs bounds and refined with a vectorized Illinois
+    (modified regula falsi) iteration, where every step is a single batch
+    DCF pass over all tickers.
+    """
+
+    def __init__(self, calculator: Optional[DCFCalculator] = None, rtol: float = 1e-9, max_iter: int = 60):
+        self.calculator = calculator or DCFCalculator()
+        self.rtol = rtol
+        self.max_iter = max_iter
+
+    def solve(self, solve_for: str, base_fcf, target_value, growth_rate, discount_rate, terminal_rate,
+              projection_years: int = 5) -> Dict[str, np.ndarray]:
+        """Implied ``solve_for`` per element; the other two rates are held fixed.
+
+        Returns ``rate`` (NaN when unsolved), ``converged``, ``iterations``,
+        ``residual`` (value minus target) and ``status``: converged,
+        not_converged, below_bounds, above_bounds or invalid_inputs.
+        """
+        if solve_for not in SOLVABLE_RATES:
+            raise ValueError(f"Can only solve for one of {', '.join(SOLVABLE_RATES)}")
+        base_fcf, target, growth, discount, terminal = np.broadcast_arrays(
+            *(np.asarray(value, dtype="f8") for value in (base_fcf, target_value, growth_rate, discount_rate, terminal_rate))
+        )
+        fixed = {"growth_rate": growth, "discount_rate": discount, "terminal_rate": terminal}
+
+        def residual(rate: np.ndarray) -> np.ndarray:
+            rates = {**fixed, solve_for: rate}
+            value = self.calculator.value_batch(base_fcf, rates["growth_rate"], rates["discount_rate"],
+                                                terminal, projection_years).intrinsic_value
+            return value - target
+
+        # Both rates must stay strictly above the terminal rate
+        low, high = input_bounds(solve_for)
+        lo = np.maximum(low, np.nextafter(terminal, np.inf))
+        hi = np.full(lo.shape, high)
+        other = "discount_rate" if solve_for == "growth_rate" else "growth_rate"
+        usable = (base_fcf > 0) & (target > 0) & (lo <= hi) & valid_rates(
+            **{other: fixed[other], solve_for: hi, "terminal_rate": terminal}
+        )
+
+        with np.errstate(invalid="ignore"):
+            f_lo, f_hi = residual(lo), residual(hi)
+        bracketed = usable & (np.sign(f_lo) != np.sign(f_hi))
+        converged = bracketed & ((f_lo == 0) | (f_hi == 0))
+        rate = np.where(f_lo == 0, lo, np.where(f_hi == 0, hi, np.nan))
+        error = np.where(converged, 0.0, np.nan)
+        iterations = np.zeros(rate.shape, dtype=int)
+
+        a, fa, b, fb = lo.copy(), f_lo.copy(), hi.copy(), f_hi.copy()
+        active = bracketed & ~converged
+        for step in range(1, self.max_iter + 1):
+            if not active.any():
+                break
+            with np.errstate(divide="ignore", invalid="ignore"):
+                c = np.where(fb != fa, b - fb * (b - a) / (fb - fa), (a + b) / 2)
+            c = np.where(active, c, b)
+            fc = residual(c)
+
+            done = active & ((np.abs(fc) <= self.rtol * target) | (np.abs(b - a) <= 1e-12))
+            rate = np.where(done, c, rate)
+            error = np.where(done, fc, error)
+            iterations = np.where(done, step, iterations)
+            converged |= done
+
+            # Keep the root bracketed; halve the stale end (Illinois) when the same side moves twice
+            flip = np.sign(fc) != np.sign(fb)
+            a, fa = np.where(flip, b, a), np.where(flip, fb, fa / 2)
+            b, fb = c, fc
+            active &= ~done
+
+        iterations = np.where(active, self.max_iter, iterations)
+        increasing = f_hi > f_lo
+        root_below = np.where(increasing, f_lo > 0, f_lo < 0)
+        status = np.select(
+            [~usable, converged, active, root_below],
+            ["invalid_inputs", "converged", "not_converged", "below_bounds"],
+            default="above_bounds"
+        )
+        logger.debug(f"@rayjosong Solved implied {solve_for} for {int(converged.sum())}/{converged.size} inputs")
+        return {
+            "rate": rate,
+            "converged": converged,
+            "iterations": iterations,
+            "residual": error,
+            "status": status,
+            "bounds": (low, high)
+        }
@@ -0,0 +1,47 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable
+import asyncio
+import functools
+from loguru import logger
+
+class SingleFlight:
+    """Share one in-flight call between all concurrent callers with the same key"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(fn())
+            self._calls[key] = call
+            call.add_done_callback(functools.partial(self._forget, key))
+        else:
+            logger.debug(f"@rayjosong Joining in-flight call for {key}")
+
+        # Shield so one caller giving up does not cancel the call for the others.
+        # Errors propagate to every waiter and the key is cleared, so the next
+        # caller retries instead of reusing the failure.
+        return await asyncio.shield(call)
+
+    def _forget(self, key: Hashable, call: asyncio.Future) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.cancelled():
+            # Mark the exception as retrieved when every waiter has gone away
+            call.exception()
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+_flights = SingleFlight()
+
+def coalesce(operation: str):
+    """Coalesce concurrent provider calls for the same (provider, operation, ticker)"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, ticker: str, *args, **kwargs):
+            provider = getattr(self, "provider_name", type(self).__name__)
+            key = (provider, operation, ticker.upper(), args, tuple(sorted(kwargs.items())))
+            return await _flights.do(key, lambda: func(self, ticker, *args, **kwargs))
+        return wrapper
+    return decorator
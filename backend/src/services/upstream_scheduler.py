@@ -0,0 +1,191 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from enum import IntEnum
+from typing import Any, Dict, List, Optional
+import asyncio
+import functools
+import heapq
+import itertools
+import time
+from loguru import logger
+from src.config import get_settings
+from src.models.errors import RateLimitError
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 10
+
+_current_priority: ContextVar[Priority] = ContextVar("upstream_priority", default=Priority.INTERACTIVE)
+
+@contextmanager
+def background_priority():
+    """Schedule upstream calls made inside this block behind user-facing ones"""
+    token = _current_priority.set(Priority.BACKGROUND)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+class TokenBucket:
+    """Per-minute token bucket with an optional hard daily cap"""
+
+    def __init__(self, requests_per_minute: float, burst: int, requests_per_day: int = 0):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = float(max(burst, 1))
+        self.daily_limit = requests_per_day
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.day = datetime.now(timezone.utc).date()
+        self.used_today = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        today = datetime.now(timezone.utc).date()
+        if today != self.day:
+            self.day = today
+            self.used_today = 0
+
+    def daily_exhausted(self) -> bool:
+        self._refill()
+        return bool(self.daily_limit) and self.used_today >= self.daily_limit
+
+    def time_until_token(self) -> float:
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self) -> None:
+        self._refill()
+        self.tokens -= 1
+        self.used_today += 1
+
+    def drain(self) -> None:
+        """Empty the bucket after the upstream rejected us despite our own accounting"""
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._refill()
+        return {
+            "tokens_available": round(self.tokens, 2),
+            "capacity": self.capacity,
+            "requests_per_minute": round(self.rate * 60, 2),
+            "daily_limit": self.daily_limit or None,
+            "daily_remaining": max(self.daily_limit - self.used_today, 0) if self.daily_limit else None
+        }
+
+@dataclass
+class _Lane:
+    bucket: TokenBucket
+    waiters: List[list] = field(default_factory=list)
+    dispatcher: Optional[asyncio.Task] = None
+    dispatched: int = 0
+    rejected: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+class UpstreamScheduler:
+    """Admit upstream calls per provider in priority order within each provider's quota.
+
+    Bursts beyond the bucket are queued and released as tokens refill rather
+    than failed. Only calls that would wait longer than ``max_wait`` seconds,
+    or that arrive after the daily quota is spent, raise RateLimitError.
+    """
+
+    def __init__(self, buckets: Dict[str, TokenBucket], max_wait: float):
+        self._lanes = {provider: _Lane(bucket) for provider, bucket in buckets.items()}
+        self.max_wait = max_wait
+        self._sequence = itertools.count()
+
+    async def acquire(self, provider: str, priority: Optional[Priority] = None) -> None:
+        lane = self._lanes.get(provider)
+        if lane is None:
+            return
+
+        priority = _current_priority.get() if priority is None else priority
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(lane.waiters, [priority, next(self._sequence), time.monotonic(), waiter])
+        if lane.dispatcher is None or lane.dispatcher.done():
+            lane.dispatcher = asyncio.ensure_future(self._dispatch(provider, lane))
+
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except asyncio.TimeoutError:
+            lane.rejected += 1
+            logger.warning(f"@rayjosong {provider} call waited over {self.max_wait}s for quota")
+            raise RateLimitError(provider)
+
+    async def _dispatch(self, provider: str, lane: _Lane) -> None:
+        while lane.waiters:
+            priority, _, enqueued_at, waiter = lane.waiters[0]
+            if waiter.done():
+                heapq.heappop(lane.waiters)
+                continue
+
+            if lane.bucket.daily_exhausted():
+                logger.error(f"@rayjosong Daily quota exhausted for {provider}")
+                for *_, pending in lane.waiters:
+                    if not pending.done():
+                        lane.rejected += 1
+                        pending.set_exception(RateLimitError(provider))
+                lane.waiters.clear()
+                break
+
+            delay = lane.bucket.time_until_token()
+            if delay > 0:
+                # Re-check the head afterwards; a higher priority call may have arrived
+                await asyncio.sleep(delay)
+                continue
+
+            heapq.heappop(lane.waiters)
+            lane.bucket.consume()
+            wait = time.monotonic() - enqueued_at
+            lane.dispatched += 1
+            lane.total_wait += wait
+            lane.max_wait = max(lane.max_wait, wait)
+            waiter.set_result(None)
+
+    def report_rejection(self, provider: str) -> None:
+        lane = self._lanes.get(provider)
+        if lane is not None:
+            logger.warning(f"@rayjosong {provider} rejected a call for rate limiting, draining its bucket")
+            lane.bucket.drain()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            provider: {
+                **lane.bucket.snapshot(),
+                "queue_depth": sum(1 for *_, waiter in lane.waiters if not waiter.done()),
+                "queued_background": sum(1 for priority, *_, waiter in lane.waiters
+                                         if priority >= Priority.BACKGROUND and not waiter.done()),
+                "dispatched": lane.dispatched,
+                "rejected": lane.rejected,
+                "avg_wait_ms": round(lane.total_wait / lane.dispatched * 1000, 2) if lane.dispatched else 0.0,
+                "max_wait_ms": round(lane.max_wait * 1000, 2)
+            }
+            for provider, lane in self._lanes.items()
+        }
+
+@functools.lru_cache()
+def get_upstream_scheduler() -> UpstreamScheduler:
+    settings = get_settings()
+    return UpstreamScheduler(
+        {
+            "Alpha Vantage": TokenBucket(
+                settings.alpha_vantage_requests_per_minute,
+                settings.alpha_vantage_burst,
+                settings.alpha_vantage_requests_per_day
+            ),
+            "Yahoo Finance": TokenBucket(
+                settings.yahoo_requests_per_minute,
+                settings.yahoo_burst,
+                settings.yahoo_requests_per_day
+            )
+        },
+        max_wait=settings.scheduler_max_wait_seconds
+    )
@@ -1,17 +1,37 @@
-from typing import Dict
-import yfinance as yf
+from typing import Dict, List, Union
+import asyncio
+import math
 from loguru import logger
 import json
 from src.models.stock import StockInfo
 from src.models.errors import StockNotFoundError, StockAPIError, RateLimitError
 from .financial_data_provider import FinancialDataProvider
-from fastapi_cache.decorator import cache
-from datetime import timedelta
-from fastapi_cache import FastAPICache
+from src.cache.decorator import cache
+from datetime import date, timedelta
+import time
+from .blocking_executor import get_yfinance_executor
+from .single_flight import coalesce
+from .upstream_scheduler import background_priority, get_upstream_scheduler
+from .bulk_cache import bulk_key, get_many, set_many
+from .yahoo_snapshot import TickerSnapshot, get_snapshot_store
+from .yahoo_sources import get_yahoo_source
+from .fundamentals_store import fiscal_date, get_fundamentals_store
+from .price_store import FULL_HISTORY, PriceSeries, frame_columns, get_price_store, period_covering, period_start
+from src.config import get_settings
+
+_EPOCH = date(1970, 1, 1)
+_DEFAULT_METADATA = {"name": "Unknown", "currency": "USD", "sector": "Unknown", "industry": "Unknown"}
+_PERIOD_FALLBACK_DAYS = 365
 
 class YahooFinanceProvider(FinancialDataProvider):
     def __init__(self):
         self.provider_name = "Yahoo Finance"
+        self.executor = get_yfinance_executor()
+        self.snapshots = get_snapshot_store()
+        self.fundamentals = get_fundamentals_store()
+        self.prices = get_price_store()
+        self.price_refresh_seconds = get_settings().price_store_refresh_minutes * 60
+        self._metadata_backfills: Dict[str, asyncio.Task] = {}
         logger.info("@rayjosong Initialized YahooFinanceProvider")
 
     def _handle_error(self, e: Exception, operation: str, ticker: str) -> None:
@@ -27,23 +47,36 @@ class YahooFinanceProvider(FinancialDataProvider):
         logger.error("@rayjosong API Error: {provider} {operation} failed for {ticker}: {error_type} - {error_message}", 
                     **error_context)
         
+        if isinstance(e, (RateLimitError, StockNotFoundError)):
+            raise e
+
         # Check for rate limit indicators
         error_msg = str(e).lower()
         # Checks if error message contains rate limit indicators (status code 429 or related phrases)
         if any(indicator in error_msg for indicator in ["rate limit", "429", "too many requests"]):
+            get_upstream_scheduler().report_rejection(self.provider_name)
             raise RateLimitError(self.provider_name)
             
         raise StockAPIError(f"Operation failed: {str(e)}")
 
+    async def _run(self, func, operation: str):
+        """Run a blocking yfinance call once the scheduler admits it"""
+        await get_upstream_scheduler().acquire(self.provider_name)
+        return await self.executor.run(func, operation=operation)
+
+    def _snapshot(self, ticker: str) -> TickerSnapshot:
+        """Shared raw data for a ticker so info/cashflow/history are fetched once per window"""
+        return self.snapshots.get(ticker, self._run)
+
     @cache(expire=timedelta(hours=1))
+    @coalesce("stock_info")
     async def get_stock_info(self, ticker: str) -> StockInfo:
         """Get basic stock information using yfinance"""
         logger.info(f"@rayjosong Calling Yahoo Finance API for {ticker} stock info")
         logger.debug("@rayjosong Fetching data for {ticker}", ticker=ticker)
         
         try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
+            info = await self._snapshot(ticker).info()
             
             if not info:
                 logger.error("@rayjosong No data found for {ticker}", ticker=ticker)
@@ -62,7 +95,8 @@ class YahooFinanceProvider(FinancialDataProvider):
                 current_price=float(current_price),
                 currency=info.get("currency", "USD"),
                 sector=info.get("sector", "Unknown"),
-                industry=info.get("industry", "Unknown")
+                industry=info.get("industry", "Unknown"),
+                market_cap=info.get("marketCap")
             )
             
             logger.info("@rayjosong Successfully retrieved stock info for {ticker}", 
@@ -73,57 +107,139 @@ class YahooFinanceProvider(FinancialDataProvider):
         except Exception as e:
             self._handle_error(e, "get_stock_info", ticker)
 
+    @cache(expire=timedelta(minutes=1))
+    @coalesce("current_price")
+    async def get_current_price(self, ticker: str) -> float:
+        """Latest price from the quote download, without the full info payload"""
+        try:
+            prices = await self._run(lambda: get_yahoo_source().last_prices([ticker]), "quote")
+            if ticker not in prices:
+                raise StockNotFoundError(ticker)
+            return prices[ticker]
+        except Exception as e:
+            self._handle_error(e, "get_current_price", ticker)
+
+    async def _get_metadata(self, tickers: List[str]) -> Dict[str, Dict]:
+        """Cached name, currency, sector and industry per ticker; misses are backfilled in the background"""
+        keys = {ticker: bulk_key("yahoo_metadata", "metadata", self.provider_name, ticker) for ticker in tickers}
+        cached = await get_many(list(keys.values()))
+        metadata = {ticker: cached[key] for ticker, key in keys.items() if key in cached}
+        self._backfill_metadata([ticker for ticker in tickers if ticker not in metadata])
+        return metadata
+
+    def _backfill_metadata(self, tickers: List[str]) -> None:
+        pending = [ticker for ticker in tickers if ticker not in self._metadata_backfills]
+        if not pending:
+            return
+        task = asyncio.ensure_future(self._fetch_metadata(pending))
+        for ticker in pending:
+            self._metadata_backfills[ticker] = task
+
+        def done(_):
+            for ticker in pending:
+                self._metadata_backfills.pop(ticker, None)
+        task.add_done_callback(done)
+
+    async def _fetch_metadata(self, tickers: List[str]) -> None:
+        """One info call per ticker, queued behind user-facing upstream calls"""
+        async def fetch(ticker: str) -> Dict:
+            info = await self._snapshot(ticker).info()
+            name = info.get("longName", info.get("shortName")) if info else None
+            if not name:
+                raise StockNotFoundError(ticker)
+            return {
+                "name": name,
+                "currency": info.get("currency", "USD"),
+                "sector": info.get("sector", "Unknown"),
+                "industry": info.get("industry", "Unknown")
+            }
+
+        with background_priority():
+            outcomes = await asyncio.gather(*(fetch(ticker) for ticker in tickers), return_exceptions=True)
+        to_cache = {
+            bulk_key("yahoo_metadata", "metadata", self.provider_name, ticker): outcome
+            for ticker, outcome in zip(tickers, outcomes) if not isinstance(outcome, Exception)
+        }
+        await set_many(to_cache, get_settings().metadata_cache_hours * 3600)
+        failed = len(tickers) - len(to_cache)
+        logger.info(f"@rayjosong Backfilled metadata for {len(to_cache)} tickers" +
+                    (f", {failed} failed" if failed else ""))
+
+    async def get_stock_infos(self, tickers: List[str]) -> Dict[str, Union[StockInfo, Exception]]:
+        """Get stock info for many tickers with bulk price downloads"""
+        logger.info(f"@rayjosong Calling Yahoo Finance bulk download for {len(tickers)} tickers")
+        chunk = get_settings().batch_download_chunk
+        chunks = [tickers[i:i + chunk] for i in range(0, len(tickers), chunk)]
+
+        downloads = await asyncio.gather(
+            *(self._run(lambda part=part: get_yahoo_source().last_prices(part), "download") for part in chunks),
+            return_exceptions=True
+        )
+        prices: Dict[str, Union[float, Exception]] = {}
+        for part, outcome in zip(chunks, downloads):
+            if isinstance(outcome, Exception):
+                logger.error(f"@rayjosong Bulk download failed for {len(part)} tickers: {str(outcome)}")
+            for ticker in part:
+                prices[ticker] = outcome if isinstance(outcome, Exception) else outcome.get(ticker)
+
+        metadata = await self._get_metadata(tickers)
+
+        results: Dict[str, Union[StockInfo, Exception]] = {}
+        for ticker in tickers:
+            price = prices.get(ticker)
+            if isinstance(price, Exception):
+                results[ticker] = StockAPIError(f"Operation failed: {str(price)}")
+            elif price is None:
+                results[ticker] = StockNotFoundError(ticker)
+            else:
+                # Metadata is cosmetic; never fail a ticker whose price arrived
+                results[ticker] = StockInfo(ticker=ticker, current_price=price,
+                                            **metadata.get(ticker, _DEFAULT_METADATA))
+        return results
+
     @cache(expire=timedelta(hours=1), namespace="yahoo_finance_financial_metrics")
+    @coalesce("financial_metrics")
     async def get_financial_metrics(self, ticker: str) -> Dict:
         """Get financial metrics including FCF using yfinance"""
         logger.info(f"@rayjosong Calling Yahoo Finance API for {ticker} financial metrics")
         logger.debug("@rayjosong Fetching financial metrics for {ticker}", ticker=ticker)
         
         try:
-            stock = yf.Ticker(ticker)
+            snapshot = self._snapshot(ticker)
             
-            # Get cash flow data
-            cashflow = stock.cashflow
-            if cashflow.empty:
-                logger.error("@rayjosong No cash flow data found for {ticker}", ticker=ticker)
-                raise StockNotFoundError(ticker)
-            
-            # Get latest year's data (first column)
-            latest_data = cashflow.iloc[:, 0]
-            
-            # Get operating cash flow and capital expenditures
-            operating_cash_flow = float(latest_data.get(
-                "Operating Cash Flow", 
-                latest_data.get("Total Cash From Operating Activities", 0)
-            ))
-            capex = float(latest_data.get(
-                "Capital Expenditure",
-                latest_data.get("Capital Expenditures", 0)
-            ))
-            
-            # Calculate FCF
-            fcf = operating_cash_flow - abs(capex)  # capex is usually negative
+            # A current stored period needs no I/O at all; the additional metrics are optional
+            period = self.fundamentals.stored(self.provider_name, ticker)
+            info_task = None
+            if period is None:
+                # Get cash flow data, warming info in parallel for the additional metrics
+                info_task = asyncio.ensure_future(snapshot.info())
+                try:
+                    period = await self._fetch_cash_flow(ticker, snapshot)
+                except Exception:
+                    info_task.cancel()
+                    raise
             
             # Get additional metrics for potential future use
-            try:
-                info = stock.info
-                additional_metrics = {
-                    "beta": info.get("beta", None),
-                    "profit_margin": info.get("profitMargins", None),
-                    "forward_pe": info.get("forwardPE", None),
-                    "trailing_pe": info.get("trailingPE", None),
-                    "dividend_yield": info.get("dividendYield", None)
-                }
-                logger.debug("@rayjosong Additional metrics for {ticker}: {metrics}", 
-                           ticker=ticker, 
-                           metrics=json.dumps(additional_metrics))
-            except Exception as e:
-                logger.warning("@rayjosong Could not fetch additional metrics: {error}", error=str(e))
-                additional_metrics = {}
+            additional_metrics = {}
+            if info_task is not None:
+                try:
+                    info = await info_task
+                    additional_metrics = {
+                        "beta": info.get("beta", None),
+                        "profit_margin": info.get("profitMargins", None),
+                        "forward_pe": info.get("forwardPE", None),
+                        "trailing_pe": info.get("trailingPE", None),
+                        "dividend_yield": info.get("dividendYield", None)
+                    }
+                    logger.debug("@rayjosong Additional metrics for {ticker}: {metrics}", 
+                               ticker=ticker, 
+                               metrics=json.dumps(additional_metrics))
+                except Exception as e:
+                    logger.warning("@rayjosong Could not fetch additional metrics: {error}", error=str(e))
             
             metrics = {
-                "fcf": fcf,
-                "year": latest_data.name.strftime("%Y-%m-%d"),
+                "fcf": period["fcf"],
+                "year": period["fiscal_date"],
                 **additional_metrics
             }
             
@@ -135,26 +251,79 @@ class YahooFinanceProvider(FinancialDataProvider):
         except Exception as e:
             self._handle_error(e, "get_financial_metrics", ticker)
 
-    def _generate_cache_key(self, symbol: str, interval: str) -> str:
-        # Ensure consistent key format
-        return f"yahoo_finance:{symbol}:{interval}"
+    async def _fetch_cash_flow(self, ticker: str, snapshot: TickerSnapshot) -> Dict:
+        """Latest annual cash flow from Yahoo, falling back to the local store if the fetch fails"""
+        try:
+            cashflow = await snapshot.cashflow()
+        except StockNotFoundError:
+            raise
+        except Exception as e:
+            stored = self.fundamentals.stored(self.provider_name, ticker, fallback=True)
+            if stored is None:
+                raise
+            logger.warning(f"@rayjosong Serving stored cash flow for {ticker} after refresh failed: {str(e)}")
+            return stored
+
+        if cashflow.empty:
+            logger.error("@rayjosong No cash flow data found for {ticker}", ticker=ticker)
+            raise StockNotFoundError(ticker)
+
+        # One column per fiscal year, newest first
+        periods = []
+        for column in cashflow.columns:
+            data = cashflow[column]
+            operating_cash_flow = float(data.get(
+                "Operating Cash Flow",
+                data.get("Total Cash From Operating Activities", 0)
+            ))
+            capex = float(data.get(
+                "Capital Expenditure",
+                data.get("Capital Expenditures", 0)
+            ))
+            if math.isnan(operating_cash_flow) or math.isnan(capex):
+                continue
+            periods.append({
+                "fiscal_date": fiscal_date(column),
+                "operating_cash_flow": operating_cash_flow,
+                "capital_expenditure": capex,
+                "fcf": operating_cash_flow - abs(capex)  # capex is usually negative
+            })
+        if not periods:
+            logger.error("@rayjosong No usable cash flow periods for {ticker}", ticker=ticker)
+            raise StockNotFoundError(ticker)
+
+        self.fundamentals.save(self.provider_name, ticker, periods)
+        return max(periods, key=lambda period: period["fiscal_date"])
+
+    async def _stored_history(self, ticker: str, period: str, start) -> PriceSeries:
+        """Daily prices from the local column store, fetching only what it is missing"""
+        wanted_from = FULL_HISTORY if start is None else (start - _EPOCH).days
+        coverage = self.prices.coverage(ticker)
 
-    async def get_historical_data(self, ticker: str, period: str = "1y") -> Dict:
-        """Get historical price data"""
-        cache_key = self._generate_cache_key(ticker, period)
+        if coverage is None or coverage[0] > wanted_from:
+            # Nothing stored yet, or this period reaches further back than what is stored
+            frame = await self._snapshot(ticker).history(period)
+            if not frame.empty:
+                self.prices.replace(ticker, frame_columns(frame), wanted_from)
+            elif coverage is None:
+                raise StockNotFoundError(ticker)
+        else:
+            _, last, checked_at = coverage
+            # Refetch from the last stored day, which may be today's still-changing bar
+            if time.time() - checked_at >= self.price_refresh_seconds:
+                gap_days = (date.today() - last.item()).days if last is not None else _PERIOD_FALLBACK_DAYS
+                frame = await self._snapshot(ticker).history(period_covering(gap_days))
+                added = self.prices.append(ticker, frame_columns(frame))
+                logger.debug(f"@rayjosong Refreshed {ticker} from {last}, {added} new trading days")
+
+        return self.prices.read(ticker)
+
+    @coalesce("historical_data")
+    async def get_historical_data(self, ticker: str, period: str = "1y") -> PriceSeries:
+        """Daily price history for a yfinance period, as zero-copy column views"""
         try:
-            # Check cache first
-            cached_data = await FastAPICache.get_backend().get(cache_key)
-            if cached_data:
-                return cached_data
-            
-            # If not in cache, fetch from API
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period=period)
-            data = hist.to_dict('index')
-            
-            # Store in cache
-            await FastAPICache.get_backend().set(cache_key, data, expire=timedelta(hours=1))
-            return data
+            start = period_start(period)
+            series = await self._stored_history(ticker, period, start)
+            return series.between(start)
         except Exception as e:
-            self._handle_error(e, "get_historical_data", ticker) 
\ No newline at end of file
+            self._handle_error(e, "get_historical_data", ticker)
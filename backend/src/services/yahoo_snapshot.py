@@ -0,0 +1,76 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict
+import asyncio
+import functools
+import time
+import pandas as pd
+from loguru import logger
+from src.config import get_settings
+from .yahoo_sources import get_yahoo_source
+
+Runner = Callable[[Callable[[], Any], str], Awaitable[Any]]
+
+class TickerSnapshot:
+    """Raw yfinance data for one ticker, each part fetched at most once.
+
+    ``info``, ``cashflow`` and each history period are loaded lazily on first
+    use. Concurrent readers of a part share the same fetch, and a failed fetch
+    is forgotten so the next reader retries it.
+    """
+
+    def __init__(self, ticker: str, run: Runner):
+        self.ticker = ticker
+        self.created_at = time.monotonic()
+        self._source = get_yahoo_source()
+        self._run = run
+        self._parts: Dict[str, asyncio.Future] = {}
+
+    async def _load(self, part: str, func: Callable[[], Any]) -> Any:
+        future = self._parts.get(part)
+        if future is None:
+            future = asyncio.ensure_future(self._run(func, part))
+            self._parts[part] = future
+            future.add_done_callback(functools.partial(self._forget_failure, part))
+        return await asyncio.shield(future)
+
+    def _forget_failure(self, part: str, future: asyncio.Future) -> None:
+        if future.cancelled() or future.exception() is not None:
+            if self._parts.get(part) is future:
+                del self._parts[part]
+
+    async def info(self) -> Dict:
+        return await self._load("info", lambda: self._source.info(self.ticker))
+
+    async def cashflow(self) -> pd.DataFrame:
+        return await self._load("cashflow", lambda: self._source.cashflow(self.ticker))
+
+    async def history(self, period: str) -> pd.DataFrame:
+        return await self._load(f"history:{period}", lambda: self._source.history(self.ticker, period))
+
+class SnapshotStore:
+    """Bounded LRU of per-ticker snapshots, each valid for one freshness window"""
+
+    def __init__(self, ttl: float, max_tickers: int):
+        self.ttl = ttl
+        self.max_tickers = max_tickers
+        self._snapshots: "OrderedDict[str, TickerSnapshot]" = OrderedDict()
+
+    def get(self, ticker: str, run: Runner) -> TickerSnapshot:
+        key = ticker.upper()
+        snapshot = self._snapshots.get(key)
+        if snapshot is None or time.monotonic() - snapshot.created_at >= self.ttl:
+            logger.debug(f"@rayjosong Starting new Yahoo snapshot for {key}")
+            snapshot = TickerSnapshot(ticker, run)
+            self._snapshots[key] = snapshot
+        self._snapshots.move_to_end(key)
+        while len(self._snapshots) > self.max_tickers:
+            self._snapshots.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, ticker: str) -> bool:
+        return self._snapshots.pop(ticker.upper(), None) is not None
+
+@functools.lru_cache()
+def get_snapshot_store() -> SnapshotStore:
+    settings = get_settings()
+    return SnapshotStore(settings.yahoo_snapshot_ttl_seconds, settings.yahoo_snapshot_max_tickers)
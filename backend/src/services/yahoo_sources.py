@@ -0,0 +1,68 @@
+from io import StringIO
+from typing import Dict, List
+import functools
+import httpx
+import pandas as pd
+import yfinance as yf
+from loguru import logger
+from src.config import get_settings
+
+class YFinanceSource:
+    """Blocking raw-data reads straight from Yahoo via yfinance"""
+
+    def info(self, ticker: str) -> Dict:
+        return yf.Ticker(ticker).info
+
+    def cashflow(self, ticker: str) -> pd.DataFrame:
+        return yf.Ticker(ticker).cashflow
+
+    def history(self, ticker: str, period: str) -> pd.DataFrame:
+        return yf.Ticker(ticker).history(period=period)
+
+    def last_prices(self, tickers: List[str]) -> Dict[str, float]:
+        """One multi-symbol download returning the latest close per ticker"""
+        frame = yf.download(tickers, period="5d", interval="1d", group_by="column",
+                            auto_adjust=False, progress=False)
+        if frame is None or frame.empty:
+            return {}
+
+        close = frame["Close"]
+        if isinstance(close, pd.Series):
+            close = close.to_frame(name=tickers[0])
+        latest = close.ffill().iloc[-1]
+        return {str(ticker): float(price) for ticker, price in latest.items() if pd.notna(price)}
+
+class StandinYahooSource:
+    """Blocking raw-data reads from the local upstream stand-in server"""
+
+    def __init__(self, base_url: str, timeout: float):
+        self.base_url = base_url.rstrip("/")
+        self.client = httpx.Client(timeout=timeout)
+
+    def _get(self, path: str, **params) -> httpx.Response:
+        response = self.client.get(f"{self.base_url}{path}", params=params)
+        response.raise_for_status()
+        return response
+
+    def _frame(self, path: str, **params) -> pd.DataFrame:
+        return pd.read_json(StringIO(self._get(path, **params).text), orient="split")
+
+    def info(self, ticker: str) -> Dict:
+        return self._get(f"/{ticker}/info").json()
+
+    def cashflow(self, ticker: str) -> pd.DataFrame:
+        return self._frame(f"/{ticker}/cashflow")
+
+    def history(self, ticker: str, period: str) -> pd.DataFrame:
+        return self._frame(f"/{ticker}/history", period=period)
+
+    def last_prices(self, tickers: List[str]) -> Dict[str, float]:
+        return self._get("/quotes", symbols=",".join(tickers)).json()
+
+@functools.lru_cache()
+def get_yahoo_source():
+    settings = get_settings()
+    if settings.yahoo_standin_url:
+        logger.warning(f"@rayjosong Yahoo Finance data served by stand-in at {settings.yahoo_standin_url}")
+        return StandinYahooSource(settings.yahoo_standin_url, settings.http_timeout_seconds)
+    return YFinanceSource()
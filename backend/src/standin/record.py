@@ -0,0 +1,73 @@
+"""Record real upstream responses for the stand-in server to replay.
+
+    python -m src.standin.record AAPL MSFT --periods 1y 5y --ollama
+
+Alpha Vantage calls use ALPHA_VANTAGE_API_KEY and count against its quota.
+"""
+from pathlib import Path
+from typing import List
+import argparse
+import json
+import httpx
+import yfinance as yf
+from loguru import logger
+from src.config import get_settings
+from src.services.moat_analyzer import MoatAnalyzer
+from .server import StandinSettings
+
+ALPHA_VANTAGE_FUNCTIONS = ("OVERVIEW", "GLOBAL_QUOTE", "CASH_FLOW")
+
+def _write(path: Path, payload: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(payload)
+    logger.info(f"@rayjosong Recorded {path}")
+
+def record_alpha_vantage(root: Path, ticker: str) -> None:
+    settings = get_settings()
+    for function in ALPHA_VANTAGE_FUNCTIONS:
+        response = httpx.get(settings.alpha_vantage_base_url, params={
+            "function": function,
+            "symbol": ticker,
+            "apikey": settings.alpha_vantage_api_key
+        }, timeout=settings.http_timeout_seconds)
+        response.raise_for_status()
+        _write(root / "alpha_vantage" / function / f"{ticker}.json", json.dumps(response.json(), indent=2))
+
+def record_yahoo(root: Path, ticker: str, periods: List[str]) -> None:
+    stock = yf.Ticker(ticker)
+    _write(root / "yahoo" / ticker / "info.json", json.dumps(stock.info, indent=2, default=str))
+    _write(root / "yahoo" / ticker / "cashflow.json", stock.cashflow.to_json(orient="split", date_format="iso"))
+    for period in periods:
+        history = stock.history(period=period)
+        _write(root / "yahoo" / ticker / f"history_{period}.json", history.to_json(orient="split", date_format="iso"))
+
+def record_ollama(root: Path, company: str) -> None:
+    settings = get_settings()
+    response = httpx.post(f"{settings.ollama_base_url.rstrip('/')}/api/generate", json={
+        "model": "phi3.5:latest",
+        "prompt": MoatAnalyzer.PROMPT_TEMPLATE.format(company=company),
+        "stream": False,
+        "format": "json"
+    }, timeout=120.0)
+    response.raise_for_status()
+    _write(root / "ollama" / "generate.json", json.dumps(response.json(), indent=2))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Record upstream responses for the stand-in server")
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--periods", nargs="+", default=["1mo", "1y", "5y"])
+    parser.add_argument("--skip-alpha-vantage", action="store_true")
+    parser.add_argument("--ollama", action="store_true", help="Also record one moat analysis response")
+    parser.add_argument("--out", default=StandinSettings().recordings_dir)
+    args = parser.parse_args()
+
+    root = Path(args.out)
+    for ticker in (ticker.upper() for ticker in args.tickers):
+        if not args.skip_alpha_vantage:
+            record_alpha_vantage(root, ticker)
+        record_yahoo(root, ticker, args.periods)
+    if args.ollama:
+        record_ollama(root, args.tickers[0].upper())
+
+if __name__ == "__main__":
+    main()
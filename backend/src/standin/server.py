@@ -0,0 +1,169 @@
+"""Local stand-in for Alpha Vantage, Yahoo Finance and Ollama.
+
+Replays recorded upstream responses with configurable latency, error and
+rate-limit injection so the full provider I/O stack can be benchmarked
+without network access:
+
+    uvicorn src.standin.server:app --port 8900
+
+and start the API with ALPHA_VANTAGE_BASE_URL=http://localhost:8900/query,
+YAHOO_STANDIN_URL=http://localhost:8900/yahoo and
+OLLAMA_BASE_URL=http://localhost:8900.
+"""
+from pathlib import Path
+from typing import Dict, Optional
+import asyncio
+import json
+import random
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from loguru import logger
+from pydantic_settings import BaseSettings
+
+class StandinSettings(BaseSettings):
+    recordings_dir: str = str(Path(__file__).parent / "recordings")
+    seed: Optional[int] = None
+
+    # Latency specs: "fixed:<ms>", "uniform:<low_ms>:<high_ms>" or "lognormal:<median_ms>:<sigma>"
+    alpha_vantage_latency: str = "lognormal:250:0.5"
+    yahoo_latency: str = "lognormal:150:0.6"
+    ollama_latency: str = "lognormal:4000:0.4"
+
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+
+    class Config:
+        env_prefix = "STANDIN_"
+        env_file = ".env"
+        extra = "ignore"
+
+class LatencyModel:
+    def __init__(self, spec: str, rng: random.Random):
+        kind, *params = spec.split(":")
+        self.kind = kind
+        self.params = [float(param) / 1000 if i == 0 or kind != "lognormal" else float(param)
+                       for i, param in enumerate(params)]
+        self.rng = rng
+        if kind not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample(self) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return self.rng.uniform(self.params[0], self.params[1])
+        median, sigma = self.params
+        return median * self.rng.lognormvariate(0, sigma)
+
+class FaultInjector:
+    """Sleep for a sampled latency, then decide whether the call errors or is rate limited"""
+
+    def __init__(self, latency: LatencyModel, error_rate: float, rate_limit_rate: float, rng: random.Random):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.rng = rng
+
+    async def apply(self) -> Optional[str]:
+        await asyncio.sleep(self.latency.sample())
+        roll = self.rng.random()
+        if roll < self.rate_limit_rate:
+            return "rate_limit"
+        if roll < self.rate_limit_rate + self.error_rate:
+            return "error"
+        return None
+
+settings = StandinSettings()
+rng = random.Random(settings.seed)
+recordings = Path(settings.recordings_dir)
+faults = {
+    upstream: FaultInjector(LatencyModel(spec, rng), settings.error_rate, settings.rate_limit_rate, rng)
+    for upstream, spec in {
+        "alpha_vantage": settings.alpha_vantage_latency,
+        "yahoo": settings.yahoo_latency,
+        "ollama": settings.ollama_latency
+    }.items()
+}
+
+app = FastAPI(title="Upstream Stand-in", description="Replays recorded upstream responses")
+
+def _load(*parts: str) -> Optional[Dict]:
+    path = recordings.joinpath(*parts)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+def _injected_error() -> JSONResponse:
+    return JSONResponse(status_code=500, content={"error": "Injected upstream failure"})
+
+@app.get("/query")
+async def alpha_vantage(function: str, symbol: str, apikey: str = ""):
+    fault = await faults["alpha_vantage"].apply()
+    if fault == "rate_limit":
+        # Alpha Vantage reports quota exhaustion as a 200 with an Information message
+        return {"Information": "Thank you for using Alpha Vantage! Our standard API rate limit is 25 requests per day."}
+    if fault == "error":
+        return _injected_error()
+
+    data = _load("alpha_vantage", function, f"{symbol.upper()}.json")
+    if data is None:
+        # Unknown symbols come back as empty payloads, like the real API
+        return {"Global Quote": {}} if function == "GLOBAL_QUOTE" else {}
+    return data
+
+async def _yahoo(symbol: str, name: str, empty: Dict) -> Response:
+    fault = await faults["yahoo"].apply()
+    if fault == "rate_limit":
+        return PlainTextResponse("Too Many Requests", status_code=429)
+    if fault == "error":
+        return _injected_error()
+    data = _load("yahoo", symbol.upper(), f"{name}.json")
+    return JSONResponse(content=empty if data is None else data)
+
+EMPTY_FRAME = {"columns": [], "index": [], "data": []}
+
+@app.get("/yahoo/quotes")
+async def yahoo_quotes(symbols: str):
+    fault = await faults["yahoo"].apply()
+    if fault == "rate_limit":
+        return PlainTextResponse("Too Many Requests", status_code=429)
+    if fault == "error":
+        return _injected_error()
+
+    prices = {}
+    for symbol in symbols.split(","):
+        info = _load("yahoo", symbol.upper(), "info.json") or {}
+        price = info.get("currentPrice") or info.get("regularMarketPrice")
+        if price is not None:
+            prices[symbol] = price
+    return prices
+
+@app.get("/yahoo/{symbol}/info")
+async def yahoo_info(symbol: str):
+    return await _yahoo(symbol, "info", {})
+
+@app.get("/yahoo/{symbol}/cashflow")
+async def yahoo_cashflow(symbol: str):
+    return await _yahoo(symbol, "cashflow", EMPTY_FRAME)
+
+@app.get("/yahoo/{symbol}/history")
+async def yahoo_history(symbol: str, period: str = "1y"):
+    return await _yahoo(symbol, f"history_{period}", EMPTY_FRAME)
+
+@app.get("/")
+async def ollama_health():
+    return PlainTextResponse("Ollama is running")
+
+@app.post("/api/generate")
+async def ollama_generate(request: Request):
+    body = await request.json()
+    fault = await faults["ollama"].apply()
+    if fault is not None:
+        return _injected_error()
+
+    data = _load("ollama", "generate.json")
+    if data is None:
+        return JSONResponse(status_code=404, content={"error": f"model '{body.get('model')}' not found"})
+    return data
+
+logger.info(f"@rayjosong Stand-in replaying recordings from {recordings}")
@@ -0,0 +1,21 @@
+import numpy as np
+from src.services.dcf_calculator import DCFCalculator
+
+def test_sensitivity_grid_masks_invalid_cells():
+    growth = np.array([0.01, 0.08])
+    discount = np.array([0.02, 0.10])
+    terminal = np.array([0.02, 0.03])
+    grid = DCFCalculator().sensitivity_grid(5e8, growth, discount, terminal)
+
+    assert grid.intrinsic_value.shape == (2, 2, 2)
+    # Only growth 0.08 and discount 0.10 beat every terminal rate and sit inside the DCFInputs bounds
+    expected_valid = np.zeros((2, 2, 2), dtype=bool)
+    expected_valid[:, 1, 1] = True
+    np.testing.assert_array_equal(grid.valid, expected_valid)
+    assert np.isnan(grid.intrinsic_value[~expected_valid]).all()
+    assert np.isfinite(grid.intrinsic_value[expected_valid]).all()
+
+def test_sensitivity_grid_is_all_nan_without_positive_fcf():
+    grid = DCFCalculator().sensitivity_grid(-5e8, [0.08], [0.10], [0.02])
+    assert not grid.valid.any()
+    assert np.isnan(grid.intrinsic_value).all()
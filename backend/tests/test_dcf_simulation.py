@@ -0,0 +1,48 @@
+import numpy as np
+from src.models.validators import RateDistribution
+from src.services.dcf_calculator import DCFCalculator
+from src.services.dcf_simulation import CHUNK_PATHS, MonteCarloDCF
+
+GROWTH = RateDistribution(kind="normal", mean=0.08, std=0.03)
+DISCOUNT = RateDistribution(kind="normal", mean=0.10, std=0.015)
+TERMINAL = RateDistribution(kind="normal", mean=0.02, std=0.005)
+
+class RecordingCalculator(DCFCalculator):
+    """Keeps the sampled growth rates of every chunk"""
+
+    def __init__(self):
+        super().__init__()
+        self.growth_chunks = []
+
+    def value_batch(self, base_fcf, growth_rate, discount_rate, terminal_rate, projection_years=5):
+        self.growth_chunks.append(np.array(growth_rate))
+        return super().value_batch(base_fcf, growth_rate, discount_rate, terminal_rate, projection_years)
+
+def simulate(simulator, ticker, paths, seed=7):
+    return simulator.simulate(ticker, 5e8, 100.0, 1e10, GROWTH, DISCOUNT, TERMINAL, paths, seed=seed)
+
+def test_seed_is_independent_of_ticker_order():
+    simulator = MonteCarloDCF()
+    forward = [simulate(simulator, ticker, 20000) for ticker in ("AAPL", "MSFT")]
+    backward = [simulate(simulator, ticker, 20000) for ticker in ("MSFT", "AAPL")][::-1]
+
+    assert [result.percentiles for result in forward] == [result.percentiles for result in backward]
+    assert forward[0].percentiles != forward[1].percentiles
+    assert forward[0].probability_undervalued == backward[0].probability_undervalued
+
+def test_seed_replays_the_same_draws_for_more_paths():
+    short, long = RecordingCalculator(), RecordingCalculator()
+    one_chunk = simulate(MonteCarloDCF(short), "AAPL", CHUNK_PATHS)
+    two_chunks = simulate(MonteCarloDCF(long), "AAPL", 2 * CHUNK_PATHS)
+
+    np.testing.assert_array_equal(short.growth_chunks[0], long.growth_chunks[0])
+    assert one_chunk.percentiles == simulate(MonteCarloDCF(), "AAPL", CHUNK_PATHS).percentiles
+    assert two_chunks.valid_paths > one_chunk.valid_paths
+
+def test_out_of_bounds_draws_are_dropped_not_clipped():
+    wide = RateDistribution(kind="uniform", mean=0.1, low=-0.2, high=0.8)
+    result = MonteCarloDCF().simulate("AAPL", 5e8, 100.0, None, wide, DISCOUNT, TERMINAL, 10000, seed=1)
+
+    # Growth is only valid in [0, 0.5], so roughly 40% of uniform draws survive
+    assert 0.3 * result.paths < result.valid_paths < 0.5 * result.paths
+    assert result.probability_undervalued is None
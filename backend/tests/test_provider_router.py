@@ -0,0 +1,16 @@
+from fastapi.testclient import TestClient
+from src.api.dependencies import get_financial_provider
+from src.main import app
+from src.services.mock_provider import MockProvider
+from src.services.provider_router import ProviderRouter
+
+def test_unsupported_operation_returns_501():
+    # MockProvider has no get_historical_data, so no provider in the chain can serve price history
+    app.dependency_overrides[get_financial_provider] = lambda: ProviderRouter([MockProvider()])
+    try:
+        response = TestClient(app).get("/api/v1/stock/AAPL/price-history")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 501
+    assert response.json()["data"]["error_code"] == "OPERATION_NOT_SUPPORTED"
@@ -0,0 +1,34 @@
+import numpy as np
+from src.services.dcf_calculator import DCFCalculator
+from src.services.reverse_dcf import ReverseDCF
+
+def test_solver_reproduces_known_rates():
+    calculator = DCFCalculator()
+    base_fcf = np.array([5e8, 2e9, 7.5e7])
+    growth = np.array([0.03, 0.12, 0.25])
+    discount = np.array([0.08, 0.10, 0.14])
+    target = calculator.value_batch(base_fcf, growth, discount, 0.02).intrinsic_value
+
+    solver = ReverseDCF(calculator)
+    implied_growth = solver.solve("growth_rate", base_fcf, target, 0.08, discount, 0.02)
+    assert implied_growth["converged"].all()
+    assert (implied_growth["status"] == "converged").all()
+    np.testing.assert_allclose(implied_growth["rate"], growth, rtol=1e-6)
+
+    implied_discount = solver.solve("discount_rate", base_fcf, target, growth, 0.10, 0.02)
+    assert implied_discount["converged"].all()
+    np.testing.assert_allclose(implied_discount["rate"], discount, rtol=1e-6)
+
+def test_solver_reports_unsolvable_inputs():
+    # Value rises with growth, so a tiny target sits below the bounds and a huge one above them
+    result = ReverseDCF().solve(
+        "growth_rate",
+        base_fcf=np.array([5e8, 5e8, -5e8, 5e8]),
+        target_value=np.array([1.0, 1e15, 8e9, 0.0]),
+        growth_rate=0.08,
+        discount_rate=0.10,
+        terminal_rate=0.02
+    )
+    assert result["status"].tolist() == ["below_bounds", "above_bounds", "invalid_inputs", "invalid_inputs"]
+    assert not result["converged"].any()
+    assert np.isnan(result["rate"]).all()